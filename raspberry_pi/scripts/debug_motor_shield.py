@@ -12,17 +12,74 @@ Examples:
 from __future__ import annotations
 
 import argparse
+import ctypes
+import ctypes.util
 import logging
+import os
 import sys
 import time
 from dataclasses import dataclass
 from typing import Optional
 
 from tocado_pi.config import EncoderConfig
-from tocado_pi.hardware import EncoderReader, MotorDriver
+from tocado_pi.hardware import EncoderReader, MotorDriver, make_fast_driver, open_smbus
 
 LOG = logging.getLogger(__name__)
 
+_CLOCK_MONOTONIC = 1
+_SLEEP_TAIL_S = 0.001
+_TIMERFD: Optional[tuple] = None  # (libc, fd) once probed; (None, -1) if unavailable
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+def _timerfd() -> tuple:
+    """Create a CLOCK_MONOTONIC timerfd once and cache it for later pulses."""
+    global _TIMERFD
+    if _TIMERFD is None:
+        _TIMERFD = (None, -1)
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.timerfd_create(_CLOCK_MONOTONIC, 0)
+        except (OSError, AttributeError, TypeError):
+            fd = -1
+        if fd >= 0:
+            _TIMERFD = (libc, fd)
+        else:
+            LOG.debug("timerfd unavailable; using monotonic deadline sleep")
+    return _TIMERFD
+
+
+def _precise_sleep(seconds: float) -> None:
+    """
+    Block for `seconds` with less overshoot than a plain time.sleep.
+
+    Arms a one-shot timerfd on CLOCK_MONOTONIC and blocks on read(); falls back
+    to a coarse sleep plus short sleeps up to a monotonic deadline.
+    """
+    if seconds <= 0:
+        return
+    libc, fd = _timerfd()
+    if fd >= 0:
+        whole = int(seconds)
+        spec = _Itimerspec(_Timespec(0, 0), _Timespec(whole, int((seconds - whole) * 1e9)))
+        if libc.timerfd_settime(fd, 0, ctypes.byref(spec), None) == 0:
+            os.read(fd, 8)
+            return
+        LOG.debug("timerfd_settime failed (errno %d); falling back", ctypes.get_errno())
+
+    deadline = time.monotonic() + seconds
+    if seconds > _SLEEP_TAIL_S:
+        time.sleep(seconds - _SLEEP_TAIL_S)
+    while (remaining := deadline - time.monotonic()) > 0:
+        time.sleep(min(remaining, _SLEEP_TAIL_S))
+
 
 def _safe_input(prompt: str) -> str:
     try:
@@ -63,6 +120,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--pin-b", type=int, default=27, help="BCM pin for encoder B")
     parser.add_argument("--no-pullup", action="store_true", help="Disable pull-ups on encoder pins")
     parser.add_argument("--i2c-address", type=lambda x: int(x, 0), default=0x60, help="I2C address of Motor Shield")
+    parser.add_argument("--i2c-bus", type=int, default=1, help="I2C bus number")
     parser.add_argument("--duty", type=float, default=1.0, help="Pulse duty cycle -1..1")
     parser.add_argument("--seconds", type=float, default=1.0, help="Pulse duration per channel")
     parser.add_argument("--rest-seconds", type=float, default=1.0, help="Rest between pulses")
@@ -103,7 +161,8 @@ def verify_supply(args: argparse.Namespace) -> tuple[Optional[float], bool]:
     return measured, ok
 
 
-def build_motor_drivers(address: int) -> dict[int, MotorDriver]:
+def build_motor_drivers(address: int, *, busnum: int = 1) -> tuple[dict[int, MotorDriver], object]:
+    """Return drivers for M1-M4 and the smbus2 bus they share (None without smbus2); the caller closes the bus."""
     try:
         from adafruit_motorkit import MotorKit  # type: ignore
     except ImportError as exc:  # pragma: no cover - hardware import
@@ -112,13 +171,16 @@ def build_motor_drivers(address: int) -> dict[int, MotorDriver]:
         ) from exc
 
     kit = MotorKit(address=address)
+    bus = open_smbus(busnum)
     motors = {}
     for channel in range(1, 5):
         motor = getattr(kit, f"motor{channel}", None)
         if motor is None:
+            if bus is not None:
+                bus.close()
             raise RuntimeError(f"motor{channel} not available from MotorKit")
-        motors[channel] = MotorDriver(motor, name=f"motor{channel}")
-    return motors
+        motors[channel] = make_fast_driver(motor, bus=bus, address=address, name=f"motor{channel}")
+    return motors, bus
 
 
 def pulse_channel(
@@ -143,7 +205,9 @@ def pulse_channel(
 
     try:
         driver.set_throttle(duty)
-        time.sleep(seconds)
+        t0 = time.monotonic()
+        _precise_sleep(seconds)
+        LOG.debug("Channel %d pulse width %.4fs", channel, time.monotonic() - t0)
     except Exception as exc:  # pragma: no cover - hardware path
         error = str(exc)
         LOG.error("Channel %d error during pulse: %s", channel, exc)
@@ -179,8 +243,14 @@ def pulse_channel(
 
 
 def summarize(results: list[ChannelResult], supply_v: Optional[float], min_supply: float) -> None:
-    responded = [r for r in results if r.responded]
-    silent = [r for r in results if not r.responded]
+    # One pass over the results; everything below is derived by bit tests.
+    mask_resp = mask_zero = 0
+    for i, r in enumerate(results):
+        if r.responded:
+            mask_resp |= 1 << i
+        if r.encoder_delta == 0:
+            mask_zero |= 1 << i
+    silent = [r for i, r in enumerate(results) if not (mask_resp >> i) & 1]
 
     print("\n=== Summary ===")
     if supply_v is None:
@@ -189,9 +259,9 @@ def summarize(results: list[ChannelResult], supply_v: Optional[float], min_suppl
         status = "ok" if supply_v >= min_supply else "LOW"
         print(f"- Motor supply: {supply_v:.2f} V ({status}, min {min_supply:.1f} V)")
 
-    for r in results:
-        status = "response" if r.responded else "no-response"
-        detail = f"encoder Δ={r.encoder_delta}"
+    for i, r in enumerate(results):
+        status = "response" if (mask_resp >> i) & 1 else "no-response"
+        detail = f"encoder Δ={r.encoder_delta} ({r.encoder_before}->{r.encoder_after})"
         if r.observation:
             detail += f", observed={r.observation}"
         if r.error:
@@ -201,12 +271,12 @@ def summarize(results: list[ChannelResult], supply_v: Optional[float], min_suppl
     print("\nLikely next checks:")
     if supply_v is not None and supply_v < min_supply:
         print("* Motor supply below expectation: verify POWER +/- wiring and fuse; keep green LED lit.")
-    if not responded:
+    if not mask_resp:
         print("* No channels produced movement/voltage: confirm motor supply present, shield seated, and TB6612/power jumper intact.")
     elif silent:
         silent_str = ", ".join(f"M{r.channel}" for r in silent)
         print(f"* {silent_str} quiet while others responded: check those screw terminals, cables, and TB6612 outputs for damage.")
-    if any(r.encoder_delta == 0 for r in results):
+    if mask_zero:
         print("* Encoder stayed at 0: verify encoder wiring, 3.3 V power, and pull-ups on the Pi pins.")
     print("* If terminal voltage stays at 0 V despite supply being good: suspect driver enable/PCA9685 or I2C control path.")
 
@@ -222,7 +292,7 @@ def main(argv: list[str] | None = None) -> int:
         return 2
 
     try:
-        drivers = build_motor_drivers(args.i2c_address)
+        drivers, bus = build_motor_drivers(args.i2c_address, busnum=args.i2c_bus)
     except Exception as exc:  # pragma: no cover - hardware path
         LOG.error("Failed to initialize MotorKit: %s", exc)
         return 2
@@ -248,6 +318,8 @@ def main(argv: list[str] | None = None) -> int:
     finally:
         for driver in drivers.values():
             driver.brake()
+        if bus is not None:
+            bus.close()
         encoder.stop()
 
     summarize(results, supply_v, args.min_supply)
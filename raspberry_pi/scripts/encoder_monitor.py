@@ -18,7 +18,7 @@ import signal
 import sys
 import time
 
-from tocado_pi.hardware import EncoderReader
+from tocado_pi.hardware import EncoderReader, PigpioEncoderReader
 from tocado_pi.config import EncoderConfig
 
 LOG = logging.getLogger(__name__)
@@ -30,6 +30,7 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--pin-b", type=int, required=True, help="BCM pin for encoder B")
     p.add_argument("--no-pullup", action="store_true", help="Disable pull-ups (default: enabled)")
     p.add_argument("--debounce-ms", type=int, default=0, help="GPIO bouncetime in ms (0 to disable)")
+    p.add_argument("--pigpio", action="store_true", help="Read edges through pigpiod instead of RPi.GPIO")
     p.add_argument("--log-edges", action="store_true", help="Print every edge (A/B states)")
     p.add_argument("--show-levels", action="store_true", help="Print raw A/B levels every interval")
     p.add_argument("--interval", type=float, default=0.2, help="Print interval seconds")
@@ -42,23 +43,16 @@ def main(argv=None) -> int:
     logging.basicConfig(level=getattr(logging, args.log_level))
 
     cfg = EncoderConfig(pin_a=args.pin_a, pin_b=args.pin_b, pull_up=not args.no_pullup, debounce_ms=args.debounce_ms)
-    enc = EncoderReader(cfg, name="monitor")
+    enc = PigpioEncoderReader(cfg, name="monitor") if args.pigpio else EncoderReader(cfg, name="monitor")
 
-    # Wrap edge handler to optionally log transitions
+    # Optionally log transitions; the listener runs right after each counted edge,
+    # so the levels the edge handler just sampled are current
     if args.log_edges:
-        orig_handle = enc._handle_edge  # type: ignore[attr-defined]
 
-        def _wrapped(ch):
-            orig_handle(ch)
-            try:
-                GPIO = enc._ensure_gpio()  # type: ignore[attr-defined]
-                a_state = GPIO.input(cfg.pin_a)
-                b_state = GPIO.input(cfg.pin_b)
-                LOG.info("edge on %s: A=%d B=%d count=%d", ch, a_state, b_state, enc.read())
-            except Exception:
-                LOG.exception("edge logging failed")
+        def _log_edge(count: int) -> None:
+            LOG.info("edge on %s: A=%s B=%s count=%d", cfg.pin_a, enc.last_a, enc.last_b, count)
 
-        enc._handle_edge = _wrapped  # type: ignore[assignment]
+        enc.add_listener(_log_edge)
 
     enc.start()
     LOG.info("Monitoring encoder on A=%s B=%s (pull-ups %s)", cfg.pin_a, cfg.pin_b, "off" if args.no_pullup else "on")
@@ -79,9 +73,7 @@ def main(argv=None) -> int:
         last = now
         if args.show_levels:
             try:
-                GPIO = enc._ensure_gpio()  # type: ignore[attr-defined]
-                a_state = GPIO.input(cfg.pin_a)
-                b_state = GPIO.input(cfg.pin_b)
+                a_state, b_state = enc.read_levels()
                 print(f"count={now} delta={delta} A={a_state} B={b_state}")
             except Exception:
                 LOG.exception("failed to read raw levels")
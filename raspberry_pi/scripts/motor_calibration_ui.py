@@ -17,19 +17,30 @@ from __future__ import annotations
 
 import argparse
 import atexit
+import gzip
+import hashlib
 import logging
+import queue
 import threading
 import time
 from typing import Any, Dict, Optional
 
-from flask import Flask, jsonify, render_template_string, request
+import orjson
+from flask import Flask, Response, request
 
 from tocado_pi.config import EncoderConfig, MotorConfig, MotorShieldConfig, MotionLimits
 from tocado_pi.hardware import EncoderReader, MotorDriver, build_motorkit_driver
 from tocado_pi.motor_control import MotorController
+from tocado_pi.web import run_server
 
 LOG = logging.getLogger(__name__)
 
+LONG_POLL_S = 0.4  # max time /status?wait=1 holds a request while nothing changes
+EVENT_MIN_INTERVAL_S = 0.1  # /events pushes at most 10 Hz while the encoder moves
+EVENT_KEEPALIVE_S = 15.0  # comment line on idle streams so proxies keep them open
+SAMPLE_INTERVAL_S = 0.1  # background encoder sampler period (matches the /events cap)
+RAW_SAMPLE_INTERVAL_NS = 1_000_000_000  # raw A/B levels only feed the history strip; 1 Hz is plenty
+
 HTML = """
 <!doctype html>
 <html lang="en">
@@ -163,7 +174,6 @@ HTML = """
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(body)
       });
-      refreshStatus();
     }
 
     function jog(dir) {
@@ -194,9 +204,7 @@ HTML = """
       sendCommand("move_fraction", { fraction: frac });
     }
 
-    async function refreshStatus() {
-      const res = await fetch("/status");
-      const m = await res.json();
+    function renderStatus(m) {
       document.getElementById("count").innerText = m.count;
       document.getElementById("delta").innerText = m.delta;
       document.getElementById("rate").innerText = m.rate_cps.toFixed(2);
@@ -218,8 +226,9 @@ HTML = """
       updateRaw(m);
     }
 
-    setInterval(refreshStatus, 100); // 10 Hz UI refresh for snappier counts
-    refreshStatus();
+    // The server pushes a status event whenever something changes (at most 10 Hz).
+    const events = new EventSource("/events");
+    events.onmessage = (e) => renderStatus(JSON.parse(e.data));
   </script>
 </body>
 </html>
@@ -227,32 +236,119 @@ HTML = """
 
 
 class CalSession:
-    def __init__(self, controller: MotorController, encoder: EncoderReader) -> None:
+    def __init__(self, controller: MotorController, encoder: EncoderReader, *, sample_interval: float = SAMPLE_INTERVAL_S) -> None:
         self.controller = controller
         self.encoder = encoder
         self._lock = threading.Lock()
         self._throttle = 0.0
         self._last_action = "idle"
-        self._last_count = 0
-        self._last_ts = time.monotonic()
         self._max_count = 0
         self._sign = 1  # +1 or -1 for travel direction
-        self._move_thread: Optional[threading.Thread] = None
         self._in_motion = False
         self._stop_flag = False
+        # Revision counter for ETag/long-poll; bumped on every state or count change.
+        self._rev = 0
+        self._changed = threading.Condition()
+        self._etag_prefix = f"{int(time.time()):x}-"
+        self._snapshot: Dict[str, Any] = {}
+        self._sample: Dict[str, Any] = {"count": 0, "delta": 0, "rate_cps": 0.0, "raw_a": None, "raw_b": None}
+        self._publish()
+        # Encoder count, rate and raw levels are sampled on one background thread,
+        # so /status and /events never touch GPIO however many clients are open.
+        self._sample_interval = sample_interval
+        self._stop_sampling = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="cal-sampler", daemon=True)
+        self._sampler.start()
+        # One long-lived worker runs moves and jog stops in submission order,
+        # instead of spawning a thread per click.
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()  # (fn, args) tuples; None stops the worker
+        self._worker = threading.Thread(target=self._work_loop, name="cal-worker", daemon=True)
+        self._worker.start()
+
+    def _publish(self) -> None:
+        """Swap in a fresh snapshot of the command-side state for lock-free status()."""
+        self._snapshot = {
+            "throttle": float(self._throttle),
+            "last_action": self._last_action,
+            "in_motion": self._in_motion,
+            "max_count": self._max_count,
+            "sign": self._sign,
+        }
+        self._bump()
+
+    def _bump(self) -> None:
+        with self._changed:
+            self._rev += 1
+            self._changed.notify_all()
+
+    def _sample_loop(self) -> None:
+        read = self.encoder.read
+        last_count, last_ts = read(), time.monotonic_ns()
+        raw_levels: tuple[Optional[int], Optional[int]] = (None, None)
+        raw_ts = 0
+        prev = None
+        while not self._stop_sampling.wait(self._sample_interval):
+            now = time.monotonic_ns()
+            count = read()
+            # Integer nanoseconds: no float subtraction of large monotonic values,
+            # just one division at the end.
+            dt_ns = now - last_ts
+            delta = count - last_count
+            rate = (delta * 1_000_000_000 / dt_ns) if dt_ns > 0 else 0.0
+            last_count, last_ts = count, now
+            if now - raw_ts >= RAW_SAMPLE_INTERVAL_NS:
+                raw_ts = now
+                try:
+                    raw_levels = self.encoder.read_levels()
+                except Exception as exc:  # pragma: no cover
+                    raw_levels = (None, None)
+                    LOG.debug("Raw read failed: %s", exc)
+            raw_a, raw_b = raw_levels
+            self._sample = {"count": count, "delta": delta, "rate_cps": rate, "raw_a": raw_a, "raw_b": raw_b}
+            key = (count, delta, raw_levels)
+            if key != prev:
+                prev = key
+                self._bump()
+
+    @property
+    def etag(self) -> str:
+        return f"{self._etag_prefix}{self._rev}"
+
+    def wait_for_change(self, etag: str, timeout: float) -> str:
+        """Block until the state no longer matches `etag` or `timeout` elapses."""
+        with self._changed:
+            if self.etag == etag:
+                self._changed.wait(timeout)
+            return self.etag
+
+    def _work_loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception:  # pragma: no cover
+                LOG.exception("Background job %s failed", getattr(fn, "__name__", fn))
 
     def _run_move(self, target: int, duty: float) -> None:
+        last_action = None
         try:
-            self._in_motion = True
             result = self.controller.move_to_count(target, duty=duty)
             LOG.info("Move done: reached=%s final=%s target=%s", result.reached, result.final_count, result.target)
-            self._last_action = f"move_to {target} reached={result.reached}"
+            last_action = f"move_to {target} reached={result.reached}"
         finally:
-            self._in_motion = False
             try:
                 self.controller.motor.brake()
             except Exception:
                 pass
+            # Same lock as command(), so this snapshot cannot overwrite a newer one.
+            with self._lock:
+                if last_action is not None:
+                    self._last_action = last_action
+                self._in_motion = False
+                self._publish()
 
     def command(self, action: str, payload: Dict[str, Any]) -> None:
         with self._lock:
@@ -288,6 +384,10 @@ class CalSession:
                 self._throttle = 0.0
                 self._last_action = "release"
             elif action == "jog":
+                if self._in_motion:
+                    self._last_action = "busy"
+                    self._publish()
+                    return
                 duty = float(payload.get("duty", 0.3) or 0.3)
                 seconds = float(payload.get("seconds", 0.25) or 0.25)
                 direction = payload.get("dir", "f")
@@ -295,9 +395,10 @@ class CalSession:
                 self.controller.motor.set_throttle(duty)
                 self._throttle = duty
                 self._last_action = f"jog {direction}"
-                threading.Thread(target=self._finish_jog, args=(seconds,), daemon=True).start()
+                self._jobs.put((self._finish_jog, (seconds,)))
             else:
                 raise ValueError(f"unknown action {action}")
+            self._publish()
 
     def _start_move(self, target: int, payload: Dict[str, Any]) -> None:
         if self._in_motion:
@@ -314,8 +415,8 @@ class CalSession:
         self.controller.cfg.limits.max_count = self._max_count
         duty = float(payload.get("duty", self.controller.cfg.shield.default_duty) or self.controller.cfg.shield.default_duty)
         LOG.info("Starting move target=%s signed=%s duty=%.2f max=%s sign=%s", target, signed_target, duty, self._max_count, self._sign)
-        self._move_thread = threading.Thread(target=self._run_move, args=(signed_target, duty), daemon=True)
-        self._move_thread.start()
+        self._in_motion = True
+        self._jobs.put((self._run_move, (signed_target, duty)))
         self._last_action = f"moving to {target} (signed {signed_target})"
 
     def _finish_jog(self, seconds: float) -> None:
@@ -323,42 +424,25 @@ class CalSession:
             time.sleep(seconds)
             self.controller.motor.brake()
         finally:
-            self._throttle = 0.0
+            with self._lock:
+                self._throttle = 0.0
+                self._publish()
 
     def status(self) -> Dict[str, Any]:
-        with self._lock:
-            now = time.monotonic()
-            count = self.encoder.read()
-            dt = now - self._last_ts if self._last_ts else 0.0
-            delta = count - self._last_count
-            rate = (delta / dt) if dt > 0 else 0.0
-            self._last_count = count
-            self._last_ts = now
-            raw_a = raw_b = None
-            try:
-                GPIO = self.encoder._ensure_gpio()  # type: ignore[attr-defined]
-                raw_a = GPIO.input(self.encoder.cfg.pin_a)  # type: ignore[attr-defined]
-                raw_b = GPIO.input(self.encoder.cfg.pin_b)  # type: ignore[attr-defined]
-            except Exception as exc:  # pragma: no cover
-                LOG.debug("Raw read failed: %s", exc)
-            return {
-                "count": count,
-                "delta": delta,
-                "rate_cps": rate,
-                "throttle": float(self._throttle),
-                "last_action": self._last_action,
-                "in_motion": self._in_motion,
-                "max_count": self._max_count,
-                "sign": self._sign,
-                "raw_a": raw_a,
-                "raw_b": raw_b,
-            }
+        # No locks and no GPIO: merge the sampler's latest reading with the last
+        # published command-side snapshot (each a single reference read).
+        return {**self._sample, **self._snapshot}
 
     def shutdown(self) -> None:
+        if self._stop_sampling.is_set():  # already shut down (finally and atexit both call this)
+            return
+        self._stop_sampling.set()
+        self._jobs.put(None)
         try:
             self.controller.motor.brake()
         except Exception:
             pass
+        self.controller.motor.close()
         try:
             self.encoder.stop()
         except Exception:
@@ -388,33 +472,87 @@ def build_controller(args, encoder: EncoderReader) -> MotorController:
     return MotorController(motor, encoder, cfg)
 
 
+def _minify_html(text: str) -> str:
+    """Drop indentation and blank lines; line breaks stay so the inline JS keeps its ASI."""
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _json(obj: Any, status: int = 200) -> Response:
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
+
+
 def create_app(session: CalSession, *, channel: int, pin_a: int, pin_b: int, address_hex: str) -> Flask:
     app = Flask(__name__)
-
-    @app.route("/")
-    def index():
-        return render_template_string(
-            HTML,
+    # All template inputs are fixed for the process lifetime: render, minify and
+    # compress the page once. The body still differs between runs (motor channel,
+    # pins), so it is revalidated by ETag rather than cached as immutable.
+    index_body = _minify_html(
+        app.jinja_env.from_string(HTML).render(
             channel=channel,
             pin_a=pin_a,
             pin_b=pin_b,
             address_hex=address_hex,
         )
+    ).encode("utf-8")
+    index_gzip = gzip.compress(index_body, mtime=0)
+    index_etag = hashlib.sha1(index_body).hexdigest()[:16]
+
+    @app.route("/")
+    def index():
+        gzipped = "gzip" in request.accept_encodings
+        resp = Response(index_gzip if gzipped else index_body, mimetype="text/html")
+        if gzipped:
+            resp.headers["Content-Encoding"] = "gzip"
+        resp.headers["Vary"] = "Accept-Encoding"
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.set_etag(index_etag)
+        return resp.make_conditional(request)
 
     @app.route("/status")
     def status():
-        return jsonify(session.status())
+        etag = session.etag
+        if request.if_none_match.contains(etag):
+            if request.args.get("wait"):
+                etag = session.wait_for_change(etag, LONG_POLL_S)
+            if request.if_none_match.contains(etag):
+                unchanged = Response(status=304)
+                unchanged.set_etag(etag)
+                return unchanged
+        response = _json(session.status())
+        response.set_etag(etag)
+        return response
+
+    @app.route("/events")
+    def events():
+        def stream():
+            etag = None
+            while True:
+                current = session.etag if etag is None else session.wait_for_change(etag, EVENT_KEEPALIVE_S)
+                if current == etag:
+                    yield b": keepalive\n\n"
+                    continue
+                etag = current
+                yield b"data: " + orjson.dumps(session.status()) + b"\n\n"
+                time.sleep(EVENT_MIN_INTERVAL_S)
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
 
     @app.route("/command", methods=["POST"])
     def command():
-        payload = request.get_json(silent=True) or {}
+        raw = request.get_data(cache=False)
+        try:
+            payload = orjson.loads(raw) if raw else {}
+        except orjson.JSONDecodeError as exc:
+            return _json({"ok": False, "error": f"invalid JSON: {exc}"}, 400)
+        if not isinstance(payload, dict):
+            return _json({"ok": False, "error": "expected a JSON object"}, 400)
         action = payload.get("action", "")
         try:
             session.command(action, payload)
         except Exception as exc:  # pragma: no cover
             LOG.error("Command %s failed: %s", action, exc)
-            return jsonify({"ok": False, "error": str(exc)}), 400
-        return jsonify({"ok": True})
+            return _json({"ok": False, "error": str(exc)}, 400)
+        return _json({"ok": True})
 
     return app
 
@@ -434,8 +572,13 @@ def main(argv=None) -> int:
     parser.add_argument("--temp-max-counts", type=int, default=200000, help="Temporary max count before calibration")
     parser.add_argument("--poll-interval", type=float, default=0.001, help="Polling interval seconds")
     parser.add_argument("--tolerance", type=int, default=2, help="Stop tolerance in counts")
+    parser.add_argument("--sample-interval", type=float, default=SAMPLE_INTERVAL_S, help="Seconds between background encoder samples for the UI")
     parser.add_argument("--host", default="0.0.0.0", help="Host/IP to bind")
     parser.add_argument("--port", type=int, default=8000, help="HTTP port")
+    parser.add_argument("--server", choices=["waitress", "flask"], default="waitress", help="HTTP server to use")
+    # Each open page pins one thread on /events for as long as it stays open, so
+    # leave ample headroom for tabs and reconnects on top of /status and /command.
+    parser.add_argument("--threads", type=int, default=16, help="Worker threads for waitress (each open page holds one for /events)")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
     args = parser.parse_args(argv)
 
@@ -452,13 +595,13 @@ def main(argv=None) -> int:
             raise
 
     controller = build_controller(args, encoder)
-    session = CalSession(controller, encoder)
+    session = CalSession(controller, encoder, sample_interval=args.sample_interval)
     atexit.register(session.shutdown)
 
     app = create_app(session, channel=args.motor_channel, pin_a=args.pin_a, pin_b=args.pin_b, address_hex=f"{args.i2c_address:02x}")
 
     try:
-        app.run(host=args.host, port=args.port, debug=False, use_reloader=False)
+        run_server(app, args)
     finally:
         session.shutdown()
     return 0
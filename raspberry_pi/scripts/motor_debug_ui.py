@@ -14,18 +14,39 @@ from __future__ import annotations
 
 import argparse
 import atexit
+import hashlib
 import logging
+import os
 import threading
 import time
 from typing import Any, Dict, Optional
 
-from flask import Flask, jsonify, render_template_string, request
+import orjson
+from flask import Flask, Response, jsonify, request
 
 from tocado_pi.config import EncoderConfig, MotorShieldConfig
-from tocado_pi.hardware import EncoderReader, MotorDriver, build_motorkit_driver
+from tocado_pi.hardware import EncoderReader, MotorDriver, MotorSession, build_motorkit_driver
+from tocado_pi.web import ORJSONProvider, enable_compression, run_server
 
 LOG = logging.getLogger(__name__)
 
+STATIC_MAX_AGE_S = 86400  # scripts under /static are versioned by content hash in the page
+STATUS_TICK_S = 0.1  # background status sample period (10 Hz, as the page used to poll)
+EVENT_KEEPALIVE_S = 15.0  # resend the last frame if the ticker has stalled, so proxies keep /events open
+
+_STATUS_FIELDS = ("count", "delta", "rate_cps", "direction", "last_dir_change", "throttle", "last_action", "raw_a", "raw_b")
+# The status schema is fixed: fill a pre-encoded template instead of walking a dict.
+# String/null fields are substituted already JSON-encoded.
+_STATUS_JSON = (
+    b'{"count":%d,"delta":%d,"rate_cps":%.2f,"direction":%s,"last_dir_change":%s,'
+    b'"throttle":%.3f,"last_action":%s,"raw_a":%s,"raw_b":%s}'
+)
+# JSON encodings of the closed value sets (actions, directions, raw levels), built once.
+_JSON_LITERALS: Dict[Any, bytes] = {
+    value: orjson.dumps(value)
+    for value in ("idle", "forward", "reverse", "brake", "release", "reset-encoder", "--", "fwd", "rev", 0, 1, None)
+}
+
 HTML = """
 <!doctype html>
 <html lang="en">
@@ -78,194 +99,164 @@ HTML = """
     </div>
   </div>
 
-  <script>
-    const history = [];
-    const levelHistory = [];
-    const MAX_LOG = 120;
-    const MAX_LEVEL_HISTORY = 60;
-    let lastDir = "--";
-    let lastDirChange = "";
-
-    function visualizeRate(rate) {
-      const mag = Math.min(20, Math.round(Math.abs(rate)));
-      if (mag === 0) return ".";
-      const bar = "|".repeat(mag);
-      return rate >= 0 ? ">" + bar : "<" + bar;
-    }
-
-    function addLogSample(m) {
-      const ts = new Date().toLocaleTimeString();
-      history.push(`${ts} c=${m.count} Δ=${m.delta} r=${m.rate_cps.toFixed(2)} dir=${m.direction} ${visualizeRate(m.rate_cps)}`);
-      if (history.length > MAX_LOG) history.shift();
-      const el = document.getElementById("log");
-      if (el) {
-        el.innerText = history.join("\\n");
-        el.scrollTop = el.scrollHeight;
-      }
-    }
-
-    function updateRaw(m) {
-      const aVal = (m.raw_a === null || m.raw_a === undefined) ? "?" : m.raw_a;
-      const bVal = (m.raw_b === null || m.raw_b === undefined) ? "?" : m.raw_b;
-      document.getElementById("rawA").innerText = aVal;
-      document.getElementById("rawB").innerText = bVal;
-      const dotA = document.getElementById("dotA");
-      const dotB = document.getElementById("dotB");
-      if (dotA) {
-        dotA.classList.remove("level-high", "level-low");
-        if (aVal == 1) dotA.classList.add("level-high"); else if (aVal == 0) dotA.classList.add("level-low");
-      }
-      if (dotB) {
-        dotB.classList.remove("level-high", "level-low");
-        if (bVal == 1) dotB.classList.add("level-high"); else if (bVal == 0) dotB.classList.add("level-low");
-      }
-      if (aVal !== "?" && bVal !== "?") {
-        levelHistory.push(`${aVal}${bVal}`);
-        if (levelHistory.length > MAX_LEVEL_HISTORY) levelHistory.shift();
-        const histEl = document.getElementById("rawHist");
-        if (histEl) histEl.innerText = levelHistory.join(" ");
-      }
-    }
-
-    async function sendCommand(action) {
-      const duty = parseFloat(document.getElementById("duty").value || "0") || 0;
-      await fetch("/command", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ action: action, duty: duty })
-      });
-      refreshStatus();
-    }
-
-    async function refreshStatus() {
-      const res = await fetch("/status");
-      const m = await res.json();
-      document.getElementById("count").innerText = m.count;
-      document.getElementById("delta").innerText = m.delta;
-      document.getElementById("rate").innerText = m.rate_cps.toFixed(2);
-      document.getElementById("direction").innerText = m.direction;
-      document.getElementById("lastDirChange").innerText = m.last_dir_change || "--";
-      document.getElementById("throttle").innerText = m.throttle.toFixed(2);
-      document.getElementById("last").innerText = m.last_action;
-      addLogSample(m);
-      updateRaw(m);
-    }
-
-    setInterval(refreshStatus, 100); // 10 Hz for less delay
-    refreshStatus();
-  </script>
+  <script src="/static/motor_debug.js?v={{ js_version }}" defer></script>
 </body>
 </html>
 """
 
 
-class SingleMotorSession:
+
+class SingleMotorSession(MotorSession):
+    """MotorSession plus direction tracking, command notifications and a JSON fast path."""
+
     def __init__(self, driver: MotorDriver, encoder: EncoderReader) -> None:
-        self.driver = driver
-        self.encoder = encoder
-        self._lock = threading.Lock()
-        self._throttle = 0.0
-        self._last_action = "idle"
-        self._last_count = 0
-        self._last_ts = time.monotonic()
-        self._last_dir = "--"
-        self._last_dir_change: Optional[str] = None
-
-    def command(self, action: str, duty: float) -> None:
-        duty = float(duty)
-        with self._lock:
-            if action == "forward":
-                self.driver.set_throttle(abs(duty))
-                self._throttle = abs(duty)
-                self._last_action = "forward"
-            elif action == "reverse":
-                self.driver.set_throttle(-abs(duty))
-                self._throttle = -abs(duty)
-                self._last_action = "reverse"
-            elif action == "brake":
-                self.driver.brake()
-                self._throttle = 0.0
-                self._last_action = "brake"
-            elif action == "release":
-                self.driver.release()
-                self._throttle = 0.0
-                self._last_action = "release"
-            elif action == "reset":
-                self.encoder.reset(0)
-                self._last_action = "reset-encoder"
-            else:
-                raise ValueError(f"unknown action {action}")
-            LOG.info("Command %s duty=%.2f", self._last_action, self._throttle)
+        super().__init__(driver, encoder)
+        self._dir_ref: tuple[str, Optional[str]] = ("--", None)  # direction, time of last change
+        # Pre-serialized status published by the ticker thread; every client reads the
+        # same bytes, so N clients cost one sample per tick rather than N.
+        self._status_bytes = b"{}"
+        self._status_seq = 0
+        self._published = threading.Condition()
+        self._wake = threading.Event()  # set by shutdown() to end the ticker's wait
+        self._stop_ticker = threading.Event()
+        self._ticker: Optional[threading.Thread] = None
+
+    def _make_snapshot(self) -> tuple:
+        # Also publish last_action already JSON-encoded for status_json().
+        return (self._throttle, self._last_action, _JSON_LITERALS[self._last_action])
+
+    def start_ticker(self, interval: float) -> None:
+        """Publish status_json() every `interval` seconds (/command also publishes)."""
+        if self._ticker is not None:
+            return
+        self.publish_status()
+        self._ticker = threading.Thread(target=self._tick_loop, args=(interval,), name="status-ticker", daemon=True)
+        self._ticker.start()
+
+    def _tick_loop(self, interval: float) -> None:
+        while not self._stop_ticker.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.publish_status()
+
+    def publish_status(self) -> bytes:
+        """Sample, publish to /status and /events waiters, and return the new status bytes."""
+        # Sample under the same lock as the swap, so publishes land in sampling order
+        # and a tick taken before a command can never replace the status after it.
+        with self._published:
+            buf = self.status_json()
+            self._status_bytes = buf
+            self._status_seq += 1
+            self._published.notify_all()
+        return buf
+
+    def latest_status(self) -> bytes:
+        return self._status_bytes
+
+    def wait_for_status(self, seq: int, timeout: float) -> tuple[int, bytes]:
+        """Block until a status newer than `seq` is published (or `timeout`); return (seq, bytes)."""
+        with self._published:
+            if self._status_seq == seq:
+                self._published.wait(timeout)
+            return self._status_seq, self._status_bytes
+
+    def shutdown(self) -> None:
+        self._stop_ticker.set()
+        self._wake.set()
+        super().shutdown()
+
+    def _sample(self) -> tuple:
+        """Take one status sample: the _STATUS_FIELDS values, then last_action as JSON."""
+        throttle, last_action, last_action_json = self.snapshot
+        count, delta, rate = self.sample()
+        direction, dir_change = self._dir_ref
+        if delta > 0:
+            if direction != "fwd":
+                dir_change = time.strftime("%H:%M:%S")
+            direction = "fwd"
+        elif delta < 0:
+            if direction != "rev":
+                dir_change = time.strftime("%H:%M:%S")
+            direction = "rev"
+        self._dir_ref = (direction, dir_change)
+        raw_a, raw_b = self.raw_levels()
+        return (count, delta, rate, direction, dir_change, throttle, last_action, raw_a, raw_b, last_action_json)
 
     def status(self) -> Dict[str, Any]:
-        with self._lock:
-            now = time.monotonic()
-            count = self.encoder.read()
-            dt = now - self._last_ts if self._last_ts else 0.0
-            delta = count - self._last_count
-            rate = (delta / dt) if dt > 0 else 0.0
-            self._last_count = count
-            self._last_ts = now
-            direction = self._last_dir
-            if delta > 0:
-                if self._last_dir != "fwd":
-                    self._last_dir_change = time.strftime("%H:%M:%S")
-                direction = "fwd"
-            elif delta < 0:
-                if self._last_dir != "rev":
-                    self._last_dir_change = time.strftime("%H:%M:%S")
-                direction = "rev"
-            self._last_dir = direction
-            raw_a = raw_b = None
-            try:
-                GPIO = self.encoder._ensure_gpio()  # type: ignore[attr-defined]
-                raw_a = GPIO.input(self.encoder.cfg.pin_a)  # type: ignore[attr-defined]
-                raw_b = GPIO.input(self.encoder.cfg.pin_b)  # type: ignore[attr-defined]
-            except Exception as exc:  # pragma: no cover - hardware path
-                LOG.debug("Failed to read raw levels: %s", exc)
-            return {
-                "count": count,
-                "delta": delta,
-                "rate_cps": rate,
-                "direction": direction,
-                "last_dir_change": self._last_dir_change,
-                "throttle": float(self._throttle),
-                "last_action": self._last_action,
-                "raw_a": raw_a,
-                "raw_b": raw_b,
-            }
+        return dict(zip(_STATUS_FIELDS, self._sample()[:-1], strict=True))  # drop the trailing JSON field
+
+    def status_json(self) -> bytes:
+        """Same as status(), formatted straight into the fixed JSON layout."""
+        count, delta, rate, direction, dir_change, throttle, _, raw_a, raw_b, last_action_json = self._sample()
+        lit = _JSON_LITERALS
+        return _STATUS_JSON % (
+            count,
+            delta,
+            rate,
+            lit[direction],
+            orjson.dumps(dir_change),
+            throttle,
+            last_action_json,
+            lit[raw_a],
+            lit[raw_b],
+        )
 
-    def shutdown(self) -> None:
-        try:
-            self.driver.brake()
-        except Exception as exc:  # pragma: no cover
-            LOG.error("Brake failed: %s", exc)
-        try:
-            self.encoder.stop()
-        except Exception as exc:  # pragma: no cover
-            LOG.error("Stop encoder failed: %s", exc)
+
+def _static_version(app: Flask, filename: str) -> str:
+    """Short content hash used to bust the browser cache when a static file changes."""
+    with open(os.path.join(app.static_folder, filename), "rb") as fh:
+        return hashlib.sha1(fh.read()).hexdigest()[:12]
 
 
 def create_app(session: SingleMotorSession, *, channel: int, pin_a: int, pin_b: int, address_hex: str) -> Flask:
-    app = Flask(__name__)
+    app = Flask(__name__, static_folder="static", static_url_path="/static")
+    # The page links each script with a content hash, so browsers may keep it.
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_MAX_AGE_S
+    app.json = ORJSONProvider(app)
+    enable_compression(app)
+
+    # All template inputs are fixed for the process lifetime: render the page once.
+    index_body = app.jinja_env.from_string(HTML).render(
+        channel=channel,
+        pin_a=pin_a,
+        pin_b=pin_b,
+        address_hex=address_hex,
+        js_version=_static_version(app, "motor_debug.js"),
+    ).encode("utf-8")
+    index_etag = hashlib.sha1(index_body).hexdigest()[:16]
 
     @app.route("/")
     def index():
-        return render_template_string(
-            HTML,
-            channel=channel,
-            pin_a=pin_a,
-            pin_b=pin_b,
-            address_hex=address_hex,
-        )
+        resp = Response(index_body, mimetype="text/html")
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.set_etag(index_etag)
+        return resp.make_conditional(request)
+
+    session.start_ticker(STATUS_TICK_S)
 
     @app.route("/status")
     def status():
-        return jsonify(session.status())
+        return app.response_class(session.latest_status(), mimetype="application/json")
+
+    @app.route("/events")
+    def events():
+        def stream():
+            seq = -1
+            while True:
+                seq, buf = session.wait_for_status(seq, EVENT_KEEPALIVE_S)
+                yield b"data: " + buf + b"\n\n"
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
 
     @app.route("/command", methods=["POST"])
     def command():
-        payload = request.get_json(silent=True) or {}
+        raw = request.get_data(cache=False)
+        try:
+            payload = orjson.loads(raw) if raw else {}
+        except orjson.JSONDecodeError as exc:
+            return jsonify({"ok": False, "error": f"invalid JSON: {exc}"}), 400
+        if not isinstance(payload, dict):
+            return jsonify({"ok": False, "error": "expected a JSON object"}), 400
         action = payload.get("action", "")
         duty = float(payload.get("duty", 0.0) or 0.0)
         try:
@@ -273,7 +264,10 @@ def create_app(session: SingleMotorSession, *, channel: int, pin_a: int, pin_b:
         except Exception as exc:  # pragma: no cover - hardware path
             LOG.error("Command %s failed: %s", action, exc)
             return jsonify({"ok": False, "error": str(exc)}), 400
-        return jsonify({"ok": True})
+        # Sample and publish right here, after the command applied: the reply and
+        # /events both carry the post-command status without waiting for a tick.
+        buf = session.publish_status()
+        return app.response_class(b'{"ok":true,"status":' + buf + b"}", mimetype="application/json")
 
     return app
 
@@ -291,6 +285,10 @@ def main(argv=None) -> int:
     parser.add_argument("--print-interval", type=float, default=0.1, help="Print interval seconds when --print-loop is set")
     parser.add_argument("--host", default="0.0.0.0", help="Host/IP to bind")
     parser.add_argument("--port", type=int, default=8000, help="HTTP port")
+    parser.add_argument("--server", choices=["waitress", "flask"], default="waitress", help="HTTP server to use")
+    # Each open page pins one thread on /events for as long as it stays open, so
+    # leave ample headroom for tabs and reconnects on top of /status and /command.
+    parser.add_argument("--threads", type=int, default=16, help="Worker threads for waitress (each open page holds one for /events)")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
     args = parser.parse_args(argv)
 
@@ -317,21 +315,19 @@ def main(argv=None) -> int:
 
     def print_loop():
         last_count = encoder.read()
-        last_ts = time.monotonic()
+        last_ts = time.monotonic_ns()
         while not stop_print:
             time.sleep(args.print_interval)
-            now = time.monotonic()
+            now = time.monotonic_ns()
             count = encoder.read()
-            dt = now - last_ts
+            dt_ns = now - last_ts
             delta = count - last_count
-            rate = (delta / dt) if dt > 0 else 0.0
+            rate = (delta * 1_000_000_000 / dt_ns) if dt_ns > 0 else 0.0
             last_count = count
             last_ts = now
             raw_a = raw_b = "?"
             try:
-                GPIO = encoder._ensure_gpio()  # type: ignore[attr-defined]
-                raw_a = GPIO.input(encoder.cfg.pin_a)  # type: ignore[attr-defined]
-                raw_b = GPIO.input(encoder.cfg.pin_b)  # type: ignore[attr-defined]
+                raw_a, raw_b = encoder.read_levels()
             except Exception:
                 pass
             print(f"count={count} delta={delta} rate={rate:.2f} rawA={raw_a} rawB={raw_b}")
@@ -340,7 +336,7 @@ def main(argv=None) -> int:
         threading.Thread(target=print_loop, daemon=True).start()
 
     try:
-        app.run(host=args.host, port=args.port, debug=False, use_reloader=False)
+        run_server(app, args)
     finally:
         stop_print = True
         session.shutdown()
@@ -8,7 +8,8 @@ Controls (terminal):
 - R: release (coast)
 - Q or Esc: quit
 
-Prints count/delta/rate at ~20 Hz; encoder updates instantly via interrupts.
+Redraws count/delta/rate on every key press and encoder change (at most 50 Hz),
+and at least every --poll-interval seconds; nothing runs between events.
 
 Example (Motor 1, encoder A/B on BCM 17/27):
     PYTHONPATH=src python scripts/motor_keyboard_control.py --motor-channel 1 --pin-a 17 --pin-b 27
@@ -20,6 +21,10 @@ import argparse
 import atexit
 import curses
 import logging
+import os
+import select
+import sys
+import threading
 import time
 
 from tocado_pi.config import EncoderConfig, MotorShieldConfig
@@ -27,6 +32,13 @@ from tocado_pi.hardware import EncoderReader, build_motorkit_driver
 
 LOG = logging.getLogger(__name__)
 
+FRAME_INTERVAL_S = 0.02  # redraw at most 50 Hz while the encoder is moving
+
+# Key codes resolved once; the key loop compares plain ints.
+_KEY_QUIT = (ord("q"), 27)  # q, Esc
+_KEY_BRAKE = ord(" ")
+_KEY_RELEASE = (ord("r"), ord("R"))
+
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Keyboard jog + fast encoder print")
@@ -37,7 +49,7 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--no-pullup", action="store_true", help="Disable pull-ups on encoder pins")
     p.add_argument("--debounce-ms", type=int, default=0, help="GPIO bouncetime in ms (0 to disable)")
     p.add_argument("--duty", type=float, default=0.4, help="Duty magnitude for forward/reverse jogs")
-    p.add_argument("--poll-interval", type=float, default=0.001, help="Poll interval seconds for display/rate")
+    p.add_argument("--poll-interval", type=float, default=0.05, help="Max seconds between display refreshes when idle")
     p.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
     return p
 
@@ -45,57 +57,101 @@ def build_parser() -> argparse.ArgumentParser:
 def run_ui(stdscr, encoder: EncoderReader, motor, duty: float, poll_interval: float):
     curses.curs_set(0)
     stdscr.nodelay(True)
-    stdscr.timeout(50)  # ~20 Hz keyboard/read loop
 
-    last_count = encoder.read()
-    last_ts = time.monotonic()
+    # Sleep in select() on stdin plus a self-pipe the encoder listener pokes, so the
+    # loop wakes on a key or a count change instead of spinning on a timer.
+    stdin_fd = sys.stdin.fileno()
+    wake_r, wake_w = os.pipe()
+    pending = threading.Event()  # one pipe byte per wake-up, not per edge
+
+    def on_count(count: int) -> None:
+        if not pending.is_set():
+            pending.set()
+            try:
+                os.write(wake_w, b"\0")
+            except OSError:  # pipe closed while the UI shuts down
+                pass
+
+    encoder.add_listener(on_count)
+
+    # Bound once: the loop below runs on every key press and encoder change.
+    getch = stdscr.getch
+    erase = stdscr.erase
+    addstr = stdscr.addstr
+    refresh = stdscr.refresh
+    monotonic = time.monotonic
+    read_count = encoder.read
+    title = "Keyboard Motor Control (q/esc quit, arrows fwd/rev, space brake, R release)"
+    forward = abs(duty)
+    reverse = -forward
+
+    last_count = read_count()
+    last_ts = monotonic()
+    motor.brake()
     throttle = 0.0
-    last_action = "idle"
+    last_action = "brake"
+    last_rendered = None  # (count, delta, throttle, last_action) on screen
 
-    def brake():
-        nonlocal throttle, last_action
+    try:
+        while True:
+            ch = getch()
+            while ch != -1:
+                if ch in _KEY_QUIT:
+                    last_action = "quit"
+                    return
+                elif ch == _KEY_BRAKE:
+                    motor.brake()
+                    throttle = 0.0
+                    last_action = "brake"
+                elif ch in _KEY_RELEASE:
+                    motor.release()
+                    throttle = 0.0
+                    last_action = "release"
+                elif ch == curses.KEY_RIGHT:
+                    motor.set_throttle(forward)
+                    throttle = forward
+                    last_action = "forward"
+                elif ch == curses.KEY_LEFT:
+                    motor.set_throttle(reverse)
+                    throttle = reverse
+                    last_action = "reverse"
+                ch = getch()
+
+            now = monotonic()
+            count = read_count()
+            dt = now - last_ts
+            delta = count - last_count
+            rate = (delta / dt) if dt > 0 else 0.0
+            last_count = count
+            last_ts = now
+
+            # Skip the curses diff + terminal write when nothing visible changed;
+            # delta is part of the key so the rate drops to 0 once after a stop.
+            shown = (count, delta, throttle, last_action)
+            if shown != last_rendered:
+                last_rendered = shown
+                erase()
+                addstr(0, 0, title)
+                addstr(2, 0, f"Count: {count:>10d}   Δ: {delta:>6d}   Rate: {rate:>8.2f} cnt/s")
+                addstr(3, 0, f"Throttle: {throttle:+.3f}   Last: {last_action}")
+                refresh()
+
+            readable, _, _ = select.select([stdin_fd, wake_r], [], [], poll_interval)
+            if wake_r in readable:
+                # Drain before clearing: an edge landing in between then finds `pending`
+                # already clear and writes a fresh byte, and the count read at the
+                # top of the loop covers edges seen while it was still set.
+                os.read(wake_r, 64)
+                pending.clear()
+                # Encoder busy: cap the redraw rate, but still react to keys at once.
+                remaining = now + FRAME_INTERVAL_S - monotonic()
+                if remaining > 0 and stdin_fd not in readable:
+                    select.select([stdin_fd], [], [], remaining)
+    finally:
+        encoder.remove_listener(on_count)
+        os.close(wake_r)
+        os.close(wake_w)
         motor.brake()
-        throttle = 0.0
-        last_action = "brake"
-
-    brake()
-
-    while True:
-        ch = stdscr.getch()
-        if ch in (ord("q"), 27):
-            last_action = "quit"
-            break
-        elif ch == ord(" "):
-            brake()
-        elif ch in (ord("r"), ord("R")):
-            motor.release()
-            throttle = 0.0
-            last_action = "release"
-        elif ch == curses.KEY_RIGHT:
-            motor.set_throttle(abs(duty))
-            throttle = abs(duty)
-            last_action = "forward"
-        elif ch == curses.KEY_LEFT:
-            motor.set_throttle(-abs(duty))
-            throttle = -abs(duty)
-            last_action = "reverse"
-
-        now = time.monotonic()
-        count = encoder.read()
-        dt = now - last_ts
-        delta = count - last_count
-        rate = (delta / dt) if dt > 0 else 0.0
-        last_count = count
-        last_ts = now
-
-        stdscr.erase()
-        stdscr.addstr(0, 0, "Keyboard Motor Control (q/esc quit, arrows fwd/rev, space brake, R release)")
-        stdscr.addstr(2, 0, f"Count: {count:>10d}   Δ: {delta:>6d}   Rate: {rate:>8.2f} cnt/s")
-        stdscr.addstr(3, 0, f"Throttle: {throttle:+.3f}   Last: {last_action}")
-        stdscr.refresh()
-        time.sleep(poll_interval)
-
-    brake()
 
 
 def main(argv=None) -> int:
@@ -109,7 +165,7 @@ def main(argv=None) -> int:
     shield_cfg = MotorShieldConfig(motor_channel=args.motor_channel, i2c_address=args.i2c_address)
     motor = build_motorkit_driver(shield_cfg)
 
-    atexit.register(lambda: (motor.brake(), encoder.stop()))
+    atexit.register(lambda: (motor.brake(), encoder.stop(), motor.close()))
     try:
         curses.wrapper(run_ui, encoder, motor, abs(args.duty), args.poll_interval)
     finally:
@@ -11,19 +11,37 @@ from __future__ import annotations
 
 import argparse
 import atexit
+import hashlib
 import logging
+import queue
+import re
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, render_template_string, request
+import orjson
+from flask import Flask, Response, jsonify, request
+from jinja2 import Environment, select_autoescape
 
 from tocado_pi.config import EncoderConfig
-from tocado_pi.hardware import EncoderReader, MotorDriver
+from tocado_pi.hardware import EncoderReader, MotorDriver, MotorSession, make_fast_driver, open_smbus
+from tocado_pi.web import ORJSONProvider, enable_compression, run_server
 
 LOG = logging.getLogger(__name__)
 
+EVENT_INTERVAL_S = 0.2  # status producer period while any motor moves; frames go out only on change
+EVENT_IDLE_INTERVAL_S = 2.0  # producer backs off to this period while every motor is idle
+EVENT_BACKOFF = 1.5  # period multiplier per idle tick
+# Column order of the positional rows pushed on /events (the page maps them back to keys).
+STATUS_ROW_FIELDS = ("channel", "count", "delta", "rate_cps", "throttle", "last_action", "raw_a", "raw_b")
+SAMPLE_INTERVAL_S = 0.01  # encoder sampler period (100 Hz)
+RATE_WINDOW_S = 0.2  # delta/rate_cps span this much sampling history, not one 10 ms tick
+RAW_SAMPLE_INTERVAL_NS = 1_000_000_000  # raw A/B levels are re-read on a count change, else at 1 Hz
+EVENT_KEEPALIVE_S = 15.0  # comment line on idle streams so proxies keep them open
+SUBSCRIBER_BACKLOG = 8  # frames queued per /events client before it is dropped as too slow
+
 HTML = """
 <!doctype html>
 <html lang="en">
@@ -72,7 +90,7 @@ HTML = """
       <div class="status">
         <div>Encoder (A/B): {{ m.pin_a if m.pin_a is not none else '-' }}/{{ m.pin_b if m.pin_b is not none else '-' }}</div>
         <div>Zähler: <span id="count-{{ m.channel }}">--</span></div>
-        <div>Δ seit letztem Poll: <span id="delta-{{ m.channel }}">--</span></div>
+        <div>Δ in {{ rate_window_ms }} ms: <span id="delta-{{ m.channel }}">--</span></div>
         <div>Rate (counts/s): <span id="rate-{{ m.channel }}">--</span></div>
         <div>Throttle: <span id="throttle-{{ m.channel }}">--</span></div>
         <div>Letzte Aktion: <span id="last-{{ m.channel }}">--</span></div>
@@ -150,17 +168,17 @@ HTML = """
     async function sendCommand(channel, action) {
       const dutyField = document.getElementById(`duty-${channel}`);
       const duty = parseFloat(dutyField.value || "0") || 0;
-      await fetch("/command", {
+      const res = await fetch("/command", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ channel: channel, action: action, duty: duty })
       });
-      refreshStatus();
+      const data = await res.json();
+      // Show the command's effect at once; the log keeps following /events only.
+      if (data.status) renderStatus(data.status, false);
     }
 
-    async function refreshStatus() {
-      const res = await fetch("/status");
-      const data = await res.json();
+    function renderStatus(data, logSample = true) {
       data.motors.forEach((m) => {
         const countEl = document.getElementById(`count-${m.channel}`);
         const deltaEl = document.getElementById(`delta-${m.channel}`);
@@ -172,134 +190,285 @@ HTML = """
         if (rateEl) { rateEl.innerText = m.rate_cps.toFixed(2); }
         if (thrEl) { thrEl.innerText = m.throttle.toFixed(2); }
         if (lastEl) { lastEl.innerText = m.last_action; }
-        addLogSample(m);
-        updateRaw(m);
+        if (logSample) {
+          addLogSample(m);
+          updateRaw(m);
+        }
       });
     }
 
-    setInterval(refreshStatus, 500);
-    refreshStatus();
+    // One server-side producer pushes status frames, only when a value changed.
+    // Frames are positional rows; ROW_FIELDS names their columns.
+    const ROW_FIELDS = {{ row_fields | tojson }};
+    function rowToStatus(row) {
+      const m = {};
+      ROW_FIELDS.forEach((key, i) => { m[key] = row[i]; });
+      return m;
+    }
+    const events = new EventSource("/events");
+    events.onmessage = (e) => renderStatus({ motors: JSON.parse(e.data).map(rowToStatus) });
   </script>
 </body>
 </html>
 """
 
+# Parsed once at import; create_app only renders it.
+_TEMPLATE = Environment(autoescape=select_autoescape(["html"], default_for_string=True)).from_string(HTML)
+
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MotorSpec:
     channel: int
     pin_a: Optional[int]
     pin_b: Optional[int]
 
 
-@dataclass
-class MotorState:
-    driver: MotorDriver
-    encoder: Optional[EncoderReader]
-    throttle: float = 0.0
-    last_action: str = "idle"
-    last_count: int = 0
-    last_ts: float = 0.0
+class MultiMotorSession:
+    """
+    Routes commands to per-motor sessions and publishes their combined status.
+
+    Each MotorSession serializes its own commands, so different channels are
+    driven concurrently. The drivers share one smbus2 bus; every write is one
+    I2C_RDWR ioctl, which the kernel runs atomically under the adapter lock
+    (see FastMotorDriver).
+    """
+
+    def __init__(self, sessions: Dict[int, MotorSession], *, bus=None) -> None:
+        self._sessions = sessions
+        self._bus = bus  # smbus2 bus shared by the drivers; closed after them in shutdown()
+        # Channels are fixed after construction: sort once instead of on every status read.
+        self._ordered: tuple = tuple(sorted(sessions.items()))
+        self._changed = threading.Condition()  # notified after every applied command
+        # channel -> recent (count, monotonic_ns) samples covering RATE_WINDOW_S; sampler-owned.
+        self._history: Dict[int, deque] = {ch: deque() for ch in sessions}
+        self._window_ns = int(RATE_WINDOW_S * 1_000_000_000)
+        # channel -> ((raw_a, raw_b), monotonic_ns of that GPIO read); sampler-owned.
+        self._raw: Dict[int, tuple] = {}
+        # channel -> (count, delta, rate_cps, raw_a, raw_b), replaced wholesale by the sampler.
+        self._slot: Dict[int, tuple] = self.sample_encoders()
+        # (slot, snapshots, body) of the last serialization; reused until either input changes.
+        self._json_cache: tuple = (None, (), b"")
 
+    def command(self, channel: int, action: str, duty: float) -> None:
+        session = self._sessions.get(channel)
+        if session is None:
+            raise ValueError(f"unknown motor channel {channel}")
+        session.command(action, duty)
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_for_command(self, timeout: float) -> bool:
+        """Block until the next command is applied or `timeout` elapses; True if a command arrived."""
+        with self._changed:
+            return self._changed.wait(timeout)
+
+    def sample_encoders(self) -> Dict[int, tuple]:
+        """
+        Read every encoder once; only the sampler thread calls this after startup.
+
+        delta and rate_cps are taken against the newest sample at least
+        RATE_WINDOW_S old, so they stay meaningful however fast the sampler runs.
+        Raw A/B levels cost two GPIO reads, so they are only re-read when the
+        count moved or the last read is RAW_SAMPLE_INTERVAL_NS old.
+        """
+        now = time.monotonic_ns()
+        window_ns = self._window_ns
+        readings = {}
+        for ch, session in self._ordered:
+            count = session.encoder.read() if session.encoder else 0
+            history = self._history[ch]
+            moved = not history or history[-1][0] != count
+            history.append((count, now))
+            while len(history) > 2 and now - history[1][1] >= window_ns:
+                history.popleft()
+            ref_count, ref_ns = history[0]
+            dt_ns = now - ref_ns
+            delta = count - ref_count
+            rate = (delta * 1_000_000_000 / dt_ns) if dt_ns > 0 else 0.0
+            raw = self._raw.get(ch)
+            if moved or raw is None or now - raw[1] >= RAW_SAMPLE_INTERVAL_NS:
+                raw = self._raw[ch] = (session.raw_levels(), now)
+            readings[ch] = (count, delta, rate) + raw[0]
+        return readings
+
+    def publish_sample(self, readings: Dict[int, tuple]) -> None:
+        self._slot = readings  # single reference swap; readers never see a half-built sample
 
-class MultiMotorSession:
-    """Serializes commands across multiple motors and tracks their state."""
+    def status_all(self) -> List[Dict[str, Any]]:
+        # Lock-free: encoder readings come from the sampler's slot, throttle/action from
+        # each session's published snapshot, so no request touches the hardware.
+        return self._build_status(self._slot, self._snapshots())
+
+    def status_json(self) -> bytes:
+        """`{"motors": status_all()}` as orjson bytes, cached per sampler tick and command."""
+        slot = self._slot
+        snaps = self._snapshots()
+        cached_slot, cached_snaps, body = self._json_cache
+        if slot is cached_slot and snaps == cached_snaps:
+            return body
+        body = orjson.dumps({"motors": self._build_status(slot, snaps)})
+        self._json_cache = (slot, snaps, body)
+        return body
+
+    def status_rows(self) -> List[tuple]:
+        """One positional row per motor in STATUS_ROW_FIELDS order (no repeated keys on the wire)."""
+        return self._build_rows(self._slot, self._snapshots())
+
+    def all_idle(self) -> bool:
+        """True when no motor is driven and no encoder moved within the rate window."""
+        slot = self._slot
+        return all(snap[0] == 0 for snap in self._snapshots()) and all(r[1] == 0 for r in slot.values())
+
+    def _snapshots(self) -> tuple:
+        return tuple(session.snapshot for _, session in self._ordered)
+
+    def _build_rows(self, slot: Dict[int, tuple], snaps: tuple) -> List[tuple]:
+        rows = []
+        for (ch, _), snap in zip(self._ordered, snaps, strict=True):
+            count, delta, rate, raw_a, raw_b = slot[ch]
+            rows.append((ch, count, delta, rate, snap[0], snap[1], raw_a, raw_b))
+        return rows
+
+    def _build_status(self, slot: Dict[int, tuple], snaps: tuple) -> List[Dict[str, Any]]:
+        return [dict(zip(STATUS_ROW_FIELDS, row, strict=True)) for row in self._build_rows(slot, snaps)]
 
-    def __init__(self, states: Dict[int, MotorState]) -> None:
-        self._states = states
+    def shutdown(self) -> None:
+        for session in self._sessions.values():
+            session.shutdown()
+        if self._bus is not None:
+            self._bus.close()
+
+
+class _Sampler(threading.Thread):
+    """Polls all encoders at a fixed period, independent of HTTP traffic."""
+
+    def __init__(self, session: MultiMotorSession, interval: float) -> None:
+        super().__init__(name="encoder-sampler", daemon=True)
+        self._session = session
+        self._interval = interval
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        session = self._session
+        deadline = time.monotonic()
+        while not self._halt.is_set():
+            session.publish_sample(session.sample_encoders())
+            deadline += self._interval
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                # Fell behind (GC pause, loaded Pi): skip the missed ticks instead of bursting.
+                deadline = time.monotonic()
+                delay = 0
+            self._halt.wait(delay)
+
+    def stop(self) -> None:
+        self._halt.set()
+
+
+class StatusBroadcaster:
+    """
+    One producer thread serializes status_rows() and fans the frame out to
+    every /events subscriber, so N viewers cost one sample per tick instead of N.
+    """
+
+    def __init__(self, session: MultiMotorSession, interval: float, idle_interval: float) -> None:
+        self._session = session
+        self._interval = interval
+        self._idle_interval = idle_interval
         self._lock = threading.Lock()
+        self._subscribers: List[queue.Queue] = []
+        self._last_frame: Optional[bytes] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="status-broadcast", daemon=True)
 
-    def command(self, channel: int, action: str, duty: float) -> None:
-        if channel not in self._states:
-            raise ValueError(f"unknown motor channel {channel}")
-        state = self._states[channel]
-        duty = float(duty)
+    def start(self) -> None:
+        self._thread.start()
 
+    def stop(self) -> None:
+        self._stop.set()
+
+    def subscribe(self) -> queue.Queue:
+        q: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
         with self._lock:
-            if action == "forward":
-                state.driver.set_throttle(abs(duty))
-                state.throttle = abs(duty)
-                state.last_action = "forward"
-            elif action == "reverse":
-                state.driver.set_throttle(-abs(duty))
-                state.throttle = -abs(duty)
-                state.last_action = "reverse"
-            elif action == "brake":
-                state.driver.brake()
-                state.throttle = 0.0
-                state.last_action = "brake"
-            elif action == "release":
-                state.driver.release()
-                state.throttle = 0.0
-                state.last_action = "release"
-            elif action == "reset":
-                if state.encoder:
-                    state.encoder.reset(0)
-                state.last_action = "reset-encoder"
-            else:
-                raise ValueError(f"unknown action {action}")
-            LOG.info("M%d %s (duty=%.2f)", channel, state.last_action, state.throttle)
+            if self._last_frame is not None:
+                q.put_nowait(self._last_frame)
+            self._subscribers.append(q)
+        return q
 
-    def status_all(self) -> List[Dict[str, Any]]:
+    def unsubscribe(self, q: queue.Queue) -> None:
         with self._lock:
-            now = time.monotonic()
-            out = []
-            for ch, state in sorted(self._states.items()):
-                count = state.encoder.read() if state.encoder else 0
-                dt = now - state.last_ts if state.last_ts else 0.0
-                delta = count - state.last_count
-                rate = (delta / dt) if dt > 0 else 0.0
-                state.last_count = count
-                state.last_ts = now
-                raw_a = raw_b = None
-                if state.encoder:
-                    try:
-                        GPIO = state.encoder._ensure_gpio()  # type: ignore[attr-defined]
-                        raw_a = GPIO.input(state.encoder.cfg.pin_a)  # type: ignore[attr-defined]
-                        raw_b = GPIO.input(state.encoder.cfg.pin_b)  # type: ignore[attr-defined]
-                    except Exception as exc:  # pragma: no cover - hardware path
-                        LOG.debug("Raw level read failed for ch %s: %s", ch, exc)
-                out.append(
-                    {
-                        "channel": ch,
-                        "count": count,
-                        "throttle": float(state.throttle),
-                        "last_action": state.last_action,
-                        "delta": delta,
-                        "rate_cps": rate,
-                        "raw_a": raw_a,
-                        "raw_b": raw_b,
-                    }
-                )
-            return out
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def _run(self) -> None:
+        session = self._session
+        period = self._interval
+        last_body = b""
+        while not self._stop.is_set():
+            body = orjson.dumps(session.status_rows())
+            if body != last_body:
+                last_body = body
+                self._publish(b"data: " + body + b"\n\n")
+            # Back off while nothing moves; any motion or command restores the fast period.
+            if session.all_idle():
+                period = min(period * EVENT_BACKOFF, self._idle_interval)
+            else:
+                period = self._interval
+            if self._session.wait_for_command(period):
+                period = self._interval
 
-    def shutdown(self) -> None:
-        for state in self._states.values():
-            try:
-                state.driver.brake()
-            except Exception as exc:  # pragma: no cover - hardware path
-                LOG.error("Failed to brake channel %s: %s", state.driver.name, exc)
-            if state.encoder:
+    def _publish(self, frame: bytes) -> None:
+        with self._lock:
+            self._last_frame = frame
+            for q in list(self._subscribers):
                 try:
-                    state.encoder.stop()
-                except Exception as exc:  # pragma: no cover - hardware path
-                    LOG.error("Failed to stop encoder for %s: %s", state.driver.name, exc)
+                    q.put_nowait(frame)
+                except queue.Full:
+                    # Client stopped reading: drop it rather than buffer without bound.
+                    self._subscribers.remove(q)
+                    with q.mutex:
+                        q.queue.clear()
+                    q.put_nowait(None)
+                    LOG.info("Dropped a slow /events client")
+
+
+_MOTOR_RE = re.compile(r"(\d+)(?::(\d+):(\d+))?")
 
 
 def parse_motor_arg(raw: str) -> MotorSpec:
-    parts = raw.split(":")
-    if len(parts) not in (1, 3):
-        raise ValueError("use CH or CH:PIN_A:PIN_B, e.g., 1:17:27")
-    channel = int(parts[0])
-    pin_a: Optional[int] = None
-    pin_b: Optional[int] = None
-    if len(parts) == 3:
-        pin_a = int(parts[1])
-        pin_b = int(parts[2])
-    return MotorSpec(channel=channel, pin_a=pin_a, pin_b=pin_b)
-
-
-def build_motor_drivers(address: int, channels: List[int]) -> Dict[int, MotorDriver]:
+    m = _MOTOR_RE.fullmatch(raw.strip())
+    if m is None:
+        raise ValueError(f"invalid --motor {raw!r}: use CH or CH:PIN_A:PIN_B, e.g., 1:17:27")
+    channel, pin_a, pin_b = m.groups()
+    if pin_a is None:
+        return MotorSpec(channel=int(channel), pin_a=None, pin_b=None)
+    return MotorSpec(channel=int(channel), pin_a=int(pin_a), pin_b=int(pin_b))
+
+
+def parse_command(raw: bytes) -> Tuple[int, str, float]:
+    """Decode a /command body into (channel, action, duty); ValueError describes bad input."""
+    try:
+        payload = orjson.loads(raw) if raw else {}
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"invalid JSON: {exc}") from None
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    channel = payload.get("channel", 0)
+    action = payload.get("action", "")
+    duty = payload.get("duty") or 0.0
+    # bool is an int subclass; reject it so `true` is not read as channel 1.
+    if type(channel) is not int:
+        raise ValueError("channel must be an integer")
+    if not isinstance(action, str):
+        raise ValueError("action must be a string")
+    if isinstance(duty, bool) or not isinstance(duty, (int, float)):
+        raise ValueError("duty must be a number")
+    return channel, action, float(duty)
+
+
+def build_motor_drivers(address: int, channels: List[int], *, busnum: int = 1) -> Tuple[Dict[int, MotorDriver], Any]:
+    """Return the drivers and the smbus2 bus they share (None without smbus2); the caller closes the bus."""
     try:
         from adafruit_motorkit import MotorKit  # type: ignore
     except ImportError as exc:  # pragma: no cover - hardware import
@@ -307,43 +476,98 @@ def build_motor_drivers(address: int, channels: List[int]) -> Dict[int, MotorDri
             "adafruit-circuitpython-motorkit not available; install requirements on the Pi."
         ) from exc
 
-    kit = MotorKit(address=address)
-    drivers: Dict[int, MotorDriver] = {}
-    for ch in channels:
-        motor = getattr(kit, f"motor{ch}", None)
-        if motor is None:
-            raise RuntimeError(f"motor{ch} not available from MotorKit")
-        drivers[ch] = MotorDriver(motor, name=f"motor{ch}")
-    return drivers
-
+    bad = [ch for ch in channels if not 1 <= ch <= 4]
+    if bad:
+        raise ValueError(f"motor channels must be 1-4, got {bad}")
 
-def create_app(session: MultiMotorSession, *, specs: List[MotorSpec], address_hex: str) -> Flask:
+    kit = MotorKit(address=address)
+    motor_map = {
+        1: kit.motor1,
+        2: kit.motor2,
+        3: kit.motor3,
+        4: kit.motor4,
+    }
+    bus = open_smbus(busnum)
+    drivers = {ch: make_fast_driver(motor_map[ch], bus=bus, address=address, name=f"motor{ch}") for ch in channels}
+    return drivers, bus
+
+
+def create_app(
+    session: MultiMotorSession,
+    *,
+    specs: List[MotorSpec],
+    address_hex: str,
+    sample_interval: float = SAMPLE_INTERVAL_S,
+) -> Flask:
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    enable_compression(app, min_size=100)  # status rows are short; compress them too
+
+    # All template inputs are fixed for the process lifetime: render the page once
+    # and keep it, with its inputs, on the app config.
+    app.config["SPECS"] = tuple(specs)
+    app.config["ADDRESS_HEX"] = address_hex
+    index_body = _TEMPLATE.render(
+        motors=app.config["SPECS"],
+        address_hex=address_hex,
+        row_fields=STATUS_ROW_FIELDS,
+        rate_window_ms=round(RATE_WINDOW_S * 1000),
+    ).encode("utf-8")
+    app.config["INDEX_HTML"] = index_body
+    app.config["INDEX_ETAG"] = hashlib.sha1(index_body).hexdigest()[:16]
 
     @app.route("/")
     def index():
-        return render_template_string(
-            HTML,
-            motors=specs,
-            address_hex=address_hex,
-        )
+        resp = Response(app.config["INDEX_HTML"], mimetype="text/html")
+        resp.headers["Cache-Control"] = "public, max-age=60"  # fixed per process; revalidated via ETag after that
+        resp.set_etag(app.config["INDEX_ETAG"])
+        return resp.make_conditional(request)
 
     @app.route("/status")
     def status():
-        return jsonify({"motors": session.status_all()})
+        resp = app.response_class(session.status_json(), mimetype="application/json")
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+
+    sampler = _Sampler(session, sample_interval)
+    sampler.start()
+    atexit.register(sampler.stop)
+
+    broadcaster = StatusBroadcaster(session, EVENT_INTERVAL_S, EVENT_IDLE_INTERVAL_S)
+    broadcaster.start()
+
+    @app.route("/events")
+    def events():
+        def stream():
+            q = broadcaster.subscribe()
+            try:
+                while True:
+                    try:
+                        frame = q.get(timeout=EVENT_KEEPALIVE_S)
+                    except queue.Empty:
+                        yield b": keepalive\n\n"
+                        continue
+                    if frame is None:
+                        return
+                    yield frame
+            finally:
+                broadcaster.unsubscribe(q)
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
 
     @app.route("/command", methods=["POST"])
     def command():
-        payload = request.get_json(silent=True) or {}
-        action = payload.get("action", "")
-        duty = float(payload.get("duty", 0.0) or 0.0)
-        channel = int(payload.get("channel", 0))
+        try:
+            channel, action, duty = parse_command(request.get_data(cache=False))
+        except ValueError as exc:
+            return jsonify({"ok": False, "error": str(exc)}), 400
         try:
             session.command(channel, action, duty)
         except Exception as exc:  # pragma: no cover - hardware path
             LOG.error("Command %s on ch %s failed: %s", action, channel, exc)
             return jsonify({"ok": False, "error": str(exc)}), 400
-        return jsonify({"ok": True})
+        # Include the post-command status so the page can update without waiting for /events.
+        return app.response_class(b'{"ok":true,"status":' + session.status_json() + b"}", mimetype="application/json")
 
     return app
 
@@ -358,6 +582,7 @@ def main(argv=None) -> int:
     )
     parser.add_argument("--motor-channel", type=int, default=1, help="Fallback motor channel if --motor not used")
     parser.add_argument("--i2c-address", type=lambda x: int(x, 0), default=0x60, help="I2C address of Motor Shield")
+    parser.add_argument("--i2c-bus", type=int, default=1, help="I2C bus number")
     parser.add_argument("--pin-a", type=int, default=17, help="Fallback BCM pin for encoder A (single motor mode)")
     parser.add_argument("--pin-b", type=int, default=27, help="Fallback BCM pin for encoder B (single motor mode)")
     parser.add_argument("--no-pullup", action="store_true", help="Disable pull-ups on encoder pins")
@@ -365,6 +590,13 @@ def main(argv=None) -> int:
     parser.add_argument("--busy-ok", action="store_true", help="Ignore GPIO busy errors (setmode already in use)")
     parser.add_argument("--host", default="0.0.0.0", help="Host/IP to bind (default: all interfaces)")
     parser.add_argument("--port", type=int, default=8000, help="HTTP port to serve on")
+    parser.add_argument("--server", choices=["waitress", "flask"], default="waitress", help="HTTP server to use")
+    # Each open page pins one thread on /events for as long as it stays open, so
+    # leave ample headroom for tabs and reconnects on top of /status and /command.
+    parser.add_argument("--threads", type=int, default=16, help="Worker threads for waitress (each open page holds one for /events)")
+    parser.add_argument(
+        "--sample-interval", type=float, default=SAMPLE_INTERVAL_S, help="Seconds between encoder samples"
+    )
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
     args = parser.parse_args(argv)
 
@@ -372,7 +604,10 @@ def main(argv=None) -> int:
 
     specs: List[MotorSpec] = []
     if args.motor:
-        specs = [parse_motor_arg(raw) for raw in args.motor]
+        try:
+            specs = [parse_motor_arg(raw) for raw in args.motor]
+        except ValueError as exc:
+            parser.error(str(exc))
     else:
         specs = [MotorSpec(channel=args.motor_channel, pin_a=args.pin_a, pin_b=args.pin_b)]
 
@@ -385,9 +620,9 @@ def main(argv=None) -> int:
         args.i2c_address,
     )
 
-    drivers = build_motor_drivers(args.i2c_address, channels)
+    drivers, bus = build_motor_drivers(args.i2c_address, channels, busnum=args.i2c_bus)
 
-    states: Dict[int, MotorState] = {}
+    sessions: Dict[int, MotorSession] = {}
     for spec in specs:
         encoder = None
         if spec.pin_a is not None and spec.pin_b is not None:
@@ -405,20 +640,15 @@ def main(argv=None) -> int:
                     raise
         else:
             LOG.warning("Motor %d has no encoder pins configured; counts will stay at 0", spec.channel)
-        states[spec.channel] = MotorState(
-            driver=drivers[spec.channel],
-            encoder=encoder,
-            last_ts=time.monotonic(),
-            last_count=encoder.read() if encoder else 0,
-        )
-
-    session = MultiMotorSession(states)
+        sessions[spec.channel] = MotorSession(drivers[spec.channel], encoder)
+
+    session = MultiMotorSession(sessions, bus=bus)
     atexit.register(session.shutdown)
 
-    app = create_app(session, specs=specs, address_hex=f"{args.i2c_address:02x}")
+    app = create_app(session, specs=specs, address_hex=f"{args.i2c_address:02x}", sample_interval=args.sample_interval)
 
     try:
-        app.run(host=args.host, port=args.port, debug=False, use_reloader=False)
+        run_server(app, args)
     finally:
         session.shutdown()
     return 0
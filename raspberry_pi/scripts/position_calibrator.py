@@ -150,6 +150,7 @@ def main(argv=None) -> int:
             motor.brake()
         except Exception:
             pass
+        motor.close()
         encoder.stop()
 
     return 0
@@ -37,6 +37,7 @@ def main(argv: list[str] | None = None) -> int:
         result = ctrl.spin_for(args.duty, args.seconds)
     finally:
         ctrl.motor.brake()
+        ctrl.motor.close()
         encoder.stop()
 
     status = "ok" if result.reached else "stopped"
@@ -0,0 +1,99 @@
+// Motor debug UI: renders /events status frames and posts /command.
+const MAX_LOG = 120;
+const MAX_LEVEL_HISTORY = 60;
+// Log lines live in a fixed ring; the DOM is written at most once per animation frame.
+const logRing = new Array(MAX_LOG);
+let logHead = 0;
+let logSize = 0;
+const levelHistory = [];
+let frameRequested = false;
+let lastDir = "--";
+let lastDirChange = "";
+
+function visualizeRate(rate) {
+  const mag = Math.min(20, Math.round(Math.abs(rate)));
+  if (mag === 0) return ".";
+  const bar = "|".repeat(mag);
+  return rate >= 0 ? ">" + bar : "<" + bar;
+}
+
+function scheduleFlush() {
+  if (!frameRequested) {
+    frameRequested = true;
+    requestAnimationFrame(flushLogs);
+  }
+}
+
+function flushLogs() {
+  frameRequested = false;
+  const el = document.getElementById("log");
+  if (el) {
+    const lines = new Array(logSize);
+    const start = (logHead - logSize + MAX_LOG) % MAX_LOG;
+    for (let i = 0; i < logSize; i++) lines[i] = logRing[(start + i) % MAX_LOG];
+    el.textContent = lines.join("\n");
+    el.scrollTop = el.scrollHeight;
+  }
+  const histEl = document.getElementById("rawHist");
+  if (histEl) histEl.textContent = levelHistory.join(" ");
+}
+
+function addLogSample(m) {
+  const ts = new Date().toLocaleTimeString();
+  logRing[logHead] = `${ts} c=${m.count} Δ=${m.delta} r=${m.rate_cps.toFixed(2)} dir=${m.direction} ${visualizeRate(m.rate_cps)}`;
+  logHead = (logHead + 1) % MAX_LOG;
+  if (logSize < MAX_LOG) logSize++;
+  scheduleFlush();
+}
+
+function updateRaw(m) {
+  const aVal = (m.raw_a === null || m.raw_a === undefined) ? "?" : m.raw_a;
+  const bVal = (m.raw_b === null || m.raw_b === undefined) ? "?" : m.raw_b;
+  document.getElementById("rawA").innerText = aVal;
+  document.getElementById("rawB").innerText = bVal;
+  const dotA = document.getElementById("dotA");
+  const dotB = document.getElementById("dotB");
+  if (dotA) {
+    dotA.classList.remove("level-high", "level-low");
+    if (aVal == 1) dotA.classList.add("level-high"); else if (aVal == 0) dotA.classList.add("level-low");
+  }
+  if (dotB) {
+    dotB.classList.remove("level-high", "level-low");
+    if (bVal == 1) dotB.classList.add("level-high"); else if (bVal == 0) dotB.classList.add("level-low");
+  }
+  if (aVal !== "?" && bVal !== "?") {
+    levelHistory.push(`${aVal}${bVal}`);
+    if (levelHistory.length > MAX_LEVEL_HISTORY) levelHistory.shift();
+    scheduleFlush();
+  }
+}
+
+async function sendCommand(action) {
+  const duty = parseFloat(document.getElementById("duty").value || "0") || 0;
+  const res = await fetch("/command", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ action: action, duty: duty })
+  });
+  const data = await res.json();
+  // Show the command's effect at once; the log keeps following /events only.
+  if (data.status) renderStatus(data.status, false);
+}
+
+function renderStatus(m, logSample = true) {
+  document.getElementById("count").innerText = m.count;
+  document.getElementById("delta").innerText = m.delta;
+  document.getElementById("rate").innerText = m.rate_cps.toFixed(2);
+  document.getElementById("direction").innerText = m.direction;
+  document.getElementById("lastDirChange").innerText = m.last_dir_change || "--";
+  document.getElementById("throttle").innerText = m.throttle.toFixed(2);
+  document.getElementById("last").innerText = m.last_action;
+  if (logSample) {
+    addLogSample(m);
+    updateRaw(m);
+  }
+}
+
+// The server pushes status on every command and at a fixed tick in between.
+const events = new EventSource("/events");
+events.onmessage = (e) => renderStatus(JSON.parse(e.data));
@@ -5,7 +5,8 @@ The package exposes:
 - Configuration defaults (`config`)
 - Hardware adapters for the PCA9685/TB6612 and encoders (`hardware`)
 - A simple position-oriented motor controller (`motor_control`)
+- Flask helpers shared by the web UIs (`web`)
 - A small CLI for manual tests (`cli`)
 """
 
-__all__ = ["config", "hardware", "motor_control", "cli"]
+__all__ = ["config", "hardware", "motor_control", "web", "cli"]
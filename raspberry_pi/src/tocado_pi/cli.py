@@ -97,6 +97,7 @@ def main(argv: list[str] | None = None) -> int:
     finally:
         encoder.stop()
         motor.brake()
+        motor.close()
 
     status = "ok" if result.reached else "not-reached"
     print(f"{cfg.name} finished: {status}, final={result.final_count}, target={result.target}, elapsed={result.elapsed_s:.2f}s")
@@ -13,7 +13,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EncoderConfig:
     """Quadrature encoder wiring."""
 
@@ -21,9 +21,15 @@ class EncoderConfig:
     pin_b: int
     pull_up: bool = True
     debounce_ms: int = 0  # hardware debouncing is preferred; this is a fallback
+    # CPUs for the GPIO callback thread (e.g. (3,) to keep edges off the control
+    # loop's core); None leaves scheduling to the kernel.
+    irq_cpus: Optional[tuple[int, ...]] = None
+    # Count every A and B edge (twice the A-only resolution) via a transition table;
+    # counts per revolution change, so recalibrate limits when enabling.
+    quadrature_x4: bool = False
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MotorShieldConfig:
     """Adafruit Motor Shield V2.3 settings."""
 
@@ -33,18 +39,23 @@ class MotorShieldConfig:
     default_duty: float = 0.5  # normalized throttle (-1..1 sign controls direction)
 
 
-@dataclass
+@dataclass(slots=True)
 class MotionLimits:
-    """Bounds and safeguards for motion commands."""
+    """Bounds and safeguards for motion commands (mutable: calibration rewrites the count window)."""
 
     min_count: int = 0
     max_count: int = 5_000
     max_runtime_s: float = 10.0
-    poll_interval_s: float = 0.01
+    poll_interval_s: float = 0.01  # sleep between reads when polling
     stop_tolerance: int = 0  # acceptable error around target
+    event_driven: bool = True  # wake moves on encoder edges when the encoder supports it
 
+    def snapshot(self) -> tuple[int, int, int, float, float]:
+        """(min_count, max_count, stop_tolerance, poll_interval_s, max_runtime_s) as of now."""
+        return (self.min_count, self.max_count, self.stop_tolerance, self.poll_interval_s, self.max_runtime_s)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class MotorConfig:
     """Combined configuration used by the controller."""
 
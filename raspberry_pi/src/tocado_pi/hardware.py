@@ -9,17 +9,54 @@ lazy to avoid failures on non-Pi development machines.
 from __future__ import annotations
 
 import logging
+import mmap
+import os
 import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 from .config import EncoderConfig, MotorShieldConfig
 
 LOG = logging.getLogger(__name__)
 
+# BCM283x/BCM2711 GPIO level register for pins 0-31, exposed via /dev/gpiomem.
+_GPIOMEM_PATH = "/dev/gpiomem"
+_GPLEV0_WORD = 0x34 // 4
+
+
+@contextmanager
+def _thread_affinity(cpus: Optional[tuple[int, ...]], name: str):
+    """
+    Temporarily restrict the calling thread to `cpus`.
+
+    GPIO libraries start their callback thread on first registration, and a
+    new thread inherits its creator's CPU mask, so registering inside this
+    block pins the callback thread without touching it directly.
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        yield
+        return
+    previous = os.sched_getaffinity(0)
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as exc:
+        LOG.warning("%s: cannot pin callback thread to CPUs %s: %s", name, cpus, exc)
+        yield
+        return
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
 
 def _clamp(value: float, low: float = -1.0, high: float = 1.0) -> float:
-    return max(low, min(high, value))
+    # Chained comparisons instead of max(min(...)): no builtin calls on the common
+    # in-range path. NaN still clamps to `high`, as it did with min/max.
+    if low <= value <= high:
+        return value
+    return low if value < low else high
 
 
 class MotorDriver:
@@ -28,6 +65,8 @@ class MotorDriver:
     Keeps the rest of the code independent from the underlying library.
     """
 
+    __slots__ = ("_motor", "name")
+
     def __init__(self, motor, name: str = "motor"):
         self._motor = motor
         self.name = name
@@ -37,25 +76,158 @@ class MotorDriver:
         Set normalized duty cycle: -1..1 where sign controls direction.
         """
         duty = _clamp(duty)
-        LOG.debug("%s throttle -> %.3f", self.name, duty)
+        if LOG.isEnabledFor(logging.DEBUG):  # skip the logging call chain on every write
+            LOG.debug("%s throttle -> %.3f", self.name, duty)
+        self._motor.throttle = duty
+
+    def set_throttle_unchecked(self, duty: float) -> None:
+        """set_throttle() for a duty the caller has already clamped to -1..1; no clamp, no logging."""
         self._motor.throttle = duty
 
     def brake(self) -> None:
         """Active brake the motor."""
-        LOG.debug("%s brake", self.name)
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s brake", self.name)
         self._motor.throttle = 0.0
 
     def release(self) -> None:
         """Release (coast) the motor."""
-        LOG.debug("%s release", self.name)
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s release", self.name)
         self._motor.throttle = None
 
+    def close(self) -> None:
+        """Free resources the driver owns; safe to call more than once."""
+
+
+# PCA9685 register block: LEDn_ON_L, LEDn_ON_H, LEDn_OFF_L, LEDn_OFF_H per channel.
+_PCA9685_LED0_ON_L = 0x06
+
+
+def _pca9685_channel_bytes(duty_cycle: int) -> tuple[int, int, int, int]:
+    """Register bytes for a 16-bit duty cycle, matching adafruit_pca9685.PWMChannel."""
+    if duty_cycle == 0xFFFF:
+        return (0x00, 0x10, 0x00, 0x00)  # full on
+    off = (duty_cycle + 1) >> 4
+    return (0x00, 0x00, off & 0xFF, off >> 8)
+
+
+class FastMotorDriver(MotorDriver):
+    """
+    MotorDriver that updates both TB6612 inputs in a single I2C transaction.
+
+    MotorKit still initializes the PCA9685 (frequency, PWM pin fully on); throttle
+    changes then write the two adjacent LEDn register blocks (8 bytes, register
+    auto-increment) through smbus2 instead of one transaction per channel.
+    Mirrors DCMotor's fast-decay mapping.
+
+    Several drivers may share one SMBus without a Python lock: each write is a
+    single I2C_RDWR ioctl carrying its own target address, and the kernel holds
+    the adapter lock for the whole transfer, so concurrent writes (from other
+    threads, or Blinka's own handle) never interleave. Only use a shared bus for
+    i2c_rdwr; the SMBus helpers that set the slave address on the fd are not
+    safe to mix in.
+    """
+
+    __slots__ = ("_bus", "_owns_bus", "_address", "_msg", "_positive", "_negative", "_low", "_reg")
+
+    def __init__(
+        self, motor, *, bus, address: int, channels: tuple[int, int], name: str = "motor", owns_bus: bool = False
+    ):
+        super().__init__(motor, name=name)
+        from smbus2 import i2c_msg  # type: ignore
+
+        self._bus = bus
+        self._owns_bus = owns_bus  # close() closes the bus only if this driver opened it
+        self._address = address
+        self._msg = i2c_msg
+        self._positive, self._negative = channels
+        self._low = min(channels)
+        self._reg = _PCA9685_LED0_ON_L + 4 * self._low
+
+    def _write(self, positive: int, negative: int) -> None:
+        if self._positive == self._low:
+            low, high = positive, negative
+        else:
+            low, high = negative, positive
+        data = [self._reg, *_pca9685_channel_bytes(low), *_pca9685_channel_bytes(high)]
+        self._bus.i2c_rdwr(self._msg.write(self._address, data))
+
+    def set_throttle(self, duty: float) -> None:
+        duty = _clamp(duty)
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s throttle -> %.3f", self.name, duty)
+        self.set_throttle_unchecked(duty)
+
+    def set_throttle_unchecked(self, duty: float) -> None:
+        if duty == 0:
+            self._write(0xFFFF, 0xFFFF)
+            return
+        level = int(0xFFFF * abs(duty))
+        if duty < 0:
+            self._write(0, level)
+        else:
+            self._write(level, 0)
+
+    def brake(self) -> None:
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s brake", self.name)
+        self._write(0xFFFF, 0xFFFF)
+
+    def release(self) -> None:
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s release", self.name)
+        self._write(0, 0)
+
+    def close(self) -> None:
+        if self._owns_bus:
+            self._owns_bus = False
+            self._bus.close()
+
+
+def open_smbus(busnum: int = 1):
+    """Open an smbus2 bus for FastMotorDriver, or return None if smbus2 is missing."""
+    try:
+        from smbus2 import SMBus  # type: ignore
+    except ImportError:
+        LOG.info("smbus2 not available; motor writes go through MotorKit")
+        return None
+    return SMBus(busnum)
 
-def build_motorkit_driver(cfg: MotorShieldConfig, *, i2c=None) -> MotorDriver:
+
+def make_fast_driver(motor, *, bus, address: int, name: str = "motor", owns_bus: bool = False) -> MotorDriver:
+    """
+    Wrap a MotorKit DC motor in FastMotorDriver when possible.
+
+    Falls back to MotorDriver without a bus, for slow-decay motors, or when the
+    motor's PCA9685 channels are unknown or not adjacent. With `owns_bus` the
+    driver's close() closes `bus` (and a fallback closes it right away).
+    """
+    positive = getattr(getattr(motor, "_positive", None), "_index", None)
+    negative = getattr(getattr(motor, "_negative", None), "_index", None)
+    if (
+        bus is None
+        or positive is None
+        or negative is None
+        or abs(positive - negative) != 1
+        or getattr(motor, "decay_mode", 0) != 0
+    ):
+        if owns_bus and bus is not None:
+            bus.close()
+        return MotorDriver(motor, name=name)
+    return FastMotorDriver(
+        motor, bus=bus, address=address, channels=(positive, negative), name=name, owns_bus=owns_bus
+    )
+
+
+def build_motorkit_driver(cfg: MotorShieldConfig, *, i2c=None, bus=None) -> MotorDriver:
     """
     Instantiate a MotorDriver using adafruit-circuitpython-motorkit.
 
-    The optional `i2c` parameter allows passing a pre-created I2C bus.
+    The optional `i2c` parameter allows passing a pre-created I2C bus. When
+    smbus2 is available the driver is a FastMotorDriver (see make_fast_driver),
+    writing through `bus` if given, else through its own bus on cfg.i2c_busnum;
+    call close() on the driver when done to release that one.
     """
     try:
         from adafruit_motorkit import MotorKit
@@ -75,19 +247,53 @@ def build_motorkit_driver(cfg: MotorShieldConfig, *, i2c=None) -> MotorDriver:
     motor = motor_map.get(cfg.motor_channel)
     if motor is None:
         raise ValueError(f"motor_channel must be 1-4, got {cfg.motor_channel}")
-    return MotorDriver(motor, name=f"motor{cfg.motor_channel}")
+    owns_bus = bus is None
+    if owns_bus:
+        bus = open_smbus(cfg.i2c_busnum)
+    return make_fast_driver(
+        motor, bus=bus, address=cfg.i2c_address, name=f"motor{cfg.motor_channel}", owns_bus=owns_bus
+    )
+
+
+# Count delta indexed by (previous AB << 2) | current AB, with AB = (A << 1) | B.
+# Signs match the A-edge decoder (+1 when A == B after an A edge); transitions
+# where both channels changed (a missed edge) count as 0.
+_QUAD_DELTA = (0, 1, -1, 0, -1, 0, 0, 1, 1, 0, 0, -1, 0, -1, 1, 0)
 
 
 class EncoderReader:
     """
-    Quadrature encoder reader driven by GPIO edge interrupts on channel A.
+    Quadrature encoder reader driven by GPIO edge interrupts on channel A
+    (or on A and B with `cfg.quadrature_x4`).
 
     Expected wiring:
     - Encoder powered at 3.3 V (recommended to keep GPIO safe), common GND.
     - A/B connected to BCM pins configured with pull-ups (default).
     - If encoder must be at 5 V: use level shifting or pull-ups to 3.3 V.
+
+    Each reader owns its counter; readers share nothing but the GPIO
+    library's callback thread, which `cfg.irq_cpus` can pin to chosen cores.
     """
 
+    # Fixed layout: the edge callback and read() hit these on every edge/poll.
+    __slots__ = (
+        "cfg",
+        "name",
+        "_gpio",
+        "_raw",
+        "_offset",
+        "_started",
+        "_gpiomem",
+        "_gplev",
+        "_listeners",
+        "_edge_io",
+        "_watch_event",
+        "_watch",
+        "_prev_ab",
+        "last_a",
+        "last_b",
+    )
+
     def __init__(
         self,
         cfg: EncoderConfig,
@@ -98,9 +304,23 @@ class EncoderReader:
         self.cfg = cfg
         self.name = name
         self._gpio = gpio  # allows injecting fake GPIO in tests
-        self._count = 0
-        self._lock = threading.Lock()
+        # Count = _raw + _offset. Only the GPIO callback thread adds to _raw (RPi.GPIO
+        # runs all callbacks on one thread), so edges need no lock; reset() rebinds
+        # _offset with one store instead of writing the edge-owned counter.
+        self._raw = 0
+        self._offset = 0
         self._started = False
+        self._gpiomem: Optional[mmap.mmap] = None
+        self._gplev: Optional[memoryview] = None
+        self._listeners: list[Callable[[int], None]] = []
+        self._edge_io: Optional[tuple] = None  # (GPIO.input, pin_a, pin_b), bound in start()
+        # Set by the edge callback when the count enters the wait_for_count() window.
+        self._watch_event = threading.Event()
+        self._watch: Optional[tuple] = None  # (low, high, min_count, max_count) for wait_for_count
+        # A/B levels sampled by the last A edge (B may have moved since; use read_levels() for live values).
+        self.last_a: Optional[int] = None
+        self.last_b: Optional[int] = None
+        self._prev_ab = 0  # (A << 1) | B at the last edge, for the x4 transition table
 
     def _ensure_gpio(self):
         if self._gpio:
@@ -116,56 +336,448 @@ class EncoderReader:
 
     def start(self) -> None:
         """
-        Configure GPIO pins and register an interrupt on channel A.
+        Configure GPIO pins and register an interrupt on channel A (and B for x4).
         Call once before reading; safe to call multiple times.
         """
         if self._started:
             return
+        gpio_injected = self._gpio
         GPIO = self._ensure_gpio()
         GPIO.setmode(GPIO.BCM)
         pull = GPIO.PUD_UP if self.cfg.pull_up else GPIO.PUD_OFF
         GPIO.setup(self.cfg.pin_a, GPIO.IN, pull_up_down=pull)
         GPIO.setup(self.cfg.pin_b, GPIO.IN, pull_up_down=pull)
+        self._edge_io = (GPIO.input, self.cfg.pin_a, self.cfg.pin_b)
+        self.last_a = GPIO.input(self.cfg.pin_a)
+        self.last_b = GPIO.input(self.cfg.pin_b)
+        self._prev_ab = (self.last_a << 1) | self.last_b
+        if gpio_injected is None:
+            self._map_level_register(GPIO)
         kwargs = {}
         if self.cfg.debounce_ms and self.cfg.debounce_ms > 0:
             kwargs["bouncetime"] = self.cfg.debounce_ms
-        GPIO.add_event_detect(
-            self.cfg.pin_a,
-            GPIO.BOTH,
-            callback=self._handle_edge,
-            **kwargs,
-        )
+        # One GPLEV0 load for both levels when mapped, else two GPIO.input calls.
+        if self.cfg.quadrature_x4:
+            pins = (self.cfg.pin_a, self.cfg.pin_b)
+            callback = self._handle_edge_x4_gplev if self._gplev is not None else self._handle_edge_x4
+        else:
+            pins = (self.cfg.pin_a,)
+            callback = self._handle_edge_gplev if self._gplev is not None else self._handle_edge
+        with _thread_affinity(self.cfg.irq_cpus, self.name):
+            for pin in pins:
+                GPIO.add_event_detect(pin, GPIO.BOTH, callback=callback, **kwargs)
         self._started = True
         LOG.info("%s listening on A=%s B=%s", self.name, self.cfg.pin_a, self.cfg.pin_b)
 
+    def _map_level_register(self, GPIO) -> None:
+        """
+        Map GPLEV0 from /dev/gpiomem so both pin levels come from one register read.
+
+        Only used for pins 0-31 and only if a probe agrees with GPIO.input (other
+        SoCs lay out /dev/gpiomem differently); otherwise read_levels() keeps
+        using GPIO.input.
+        """
+        if max(self.cfg.pin_a, self.cfg.pin_b) > 31:
+            return
+        try:
+            with open(_GPIOMEM_PATH, "r+b") as fh:
+                mem = mmap.mmap(fh.fileno(), mmap.PAGESIZE)
+        except OSError as exc:
+            LOG.debug("%s: %s not mapped (%s); using GPIO.input", self.name, _GPIOMEM_PATH, exc)
+            return
+        view = memoryview(mem).cast("I")
+        level = view[_GPLEV0_WORD]
+        expected = (GPIO.input(self.cfg.pin_a), GPIO.input(self.cfg.pin_b))
+        if ((level >> self.cfg.pin_a) & 1, (level >> self.cfg.pin_b) & 1) != expected:
+            LOG.debug("%s: GPLEV0 probe disagrees with GPIO.input; using GPIO.input", self.name)
+            view.release()
+            mem.close()
+            return
+        self._gpiomem = mem
+        self._gplev = view
+
     def stop(self) -> None:
         if not self._started:
             return
         GPIO = self._ensure_gpio()
         if GPIO.getmode() is not None:
             GPIO.remove_event_detect(self.cfg.pin_a)
+            if self.cfg.quadrature_x4:
+                GPIO.remove_event_detect(self.cfg.pin_b)
+        if self._gpiomem is not None:
+            self._gplev.release()
+            self._gpiomem.close()
+            self._gpiomem = self._gplev = None
         self._started = False
 
     def _handle_edge(self, channel) -> None:
+        # Runs once per A edge on the GPIO thread: everything is pre-bound in start().
+        read_pin, pin_a, pin_b = self._edge_io
+        a = read_pin(pin_a)
+        b = read_pin(pin_b)
+        self.last_a = a
+        self.last_b = b
+        self._add(1 - ((a ^ b) << 1))  # +1 when A == B, -1 otherwise
+
+    def _handle_edge_gplev(self, channel) -> None:
+        _, pin_a, pin_b = self._edge_io
+        level = self._gplev[_GPLEV0_WORD]
+        a = (level >> pin_a) & 1
+        b = (level >> pin_b) & 1
+        self.last_a = a
+        self.last_b = b
+        self._add(1 - ((a ^ b) << 1))
+
+    def _handle_edge_x4(self, channel) -> None:
+        # Runs on every A and B edge; the table turns (previous, current) AB into the step.
+        read_pin, pin_a, pin_b = self._edge_io
+        a = read_pin(pin_a)
+        b = read_pin(pin_b)
+        self._step_x4(a, b)
+
+    def _handle_edge_x4_gplev(self, channel) -> None:
+        _, pin_a, pin_b = self._edge_io
+        level = self._gplev[_GPLEV0_WORD]
+        self._step_x4((level >> pin_a) & 1, (level >> pin_b) & 1)
+
+    def _step_x4(self, a: int, b: int) -> None:
+        self.last_a = a
+        self.last_b = b
+        ab = (a << 1) | b
+        delta = _QUAD_DELTA[(self._prev_ab << 2) | ab]
+        self._prev_ab = ab
+        if delta:  # 0 = no state change (bounce) or a skipped state
+            self._add(delta)
+
+    def _add(self, delta: int) -> None:
+        self._raw += delta
+        count = self._raw + self._offset
+        watch = self._watch
+        if watch is not None and (watch[0] <= count <= watch[1] or not watch[2] <= count <= watch[3]):
+            self._watch_event.set()
+        for callback in self._listeners:
+            callback(count)
+
+    def add_listener(self, callback: Callable[[int], None]) -> None:
+        """
+        Call `callback(count)` after every counted edge.
+
+        Runs on the GPIO callback thread, so keep it short and non-blocking.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[int], None]) -> None:
+        self._listeners.remove(callback)
+
+    def read_levels(self) -> tuple[int, int]:
+        """
+        Return the raw (A, B) pin levels.
+
+        Uses a single GPLEV0 read when /dev/gpiomem is mapped, otherwise two
+        GPIO.input calls.
+        """
+        gplev = self._gplev
+        if gplev is not None:
+            level = gplev[_GPLEV0_WORD]
+            return (level >> self.cfg.pin_a) & 1, (level >> self.cfg.pin_b) & 1
+        edge_io = self._edge_io
+        if edge_io is not None:
+            read_pin, pin_a, pin_b = edge_io
+            return read_pin(pin_a), read_pin(pin_b)
         GPIO = self._ensure_gpio()
-        a_state = GPIO.input(self.cfg.pin_a)
-        b_state = GPIO.input(self.cfg.pin_b)
-        delta = 1 if a_state == b_state else -1
-        with self._lock:
-            self._count += delta
+        return GPIO.input(self.cfg.pin_a), GPIO.input(self.cfg.pin_b)
 
     def read(self) -> int:
         """
         Return the latest signed count.
+
+        Lock-free: both fields are single-writer ints, and int loads are atomic
+        under the GIL. A read racing reset() may mix the old raw count with
+        the new offset, i.e. land a few edges off the reset value, once.
         """
-        with self._lock:
-            return int(self._count)
+        return self._raw + self._offset
+
+    def wait_for_count(
+        self,
+        target: int,
+        tol: int,
+        timeout: float,
+        *,
+        min_count: Optional[int] = None,
+        max_count: Optional[int] = None,
+        stopped: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """
+        Block until the count is within `tol` of `target` or leaves
+        [min_count, max_count], until `timeout` elapses, or until wake_waiter()
+        is called. Returns the count.
+
+        `stopped` is re-checked once the wait is armed, so a stop whose
+        wake_waiter() landed just before this call is not slept through.
+        Woken directly from the edge callback; intended for one waiter at a time
+        (the controller driving this encoder).
+        """
+        tol = max(tol, 0)
+        low, high = target - tol, target + tol
+        min_c = float("-inf") if min_count is None else min_count
+        max_c = float("inf") if max_count is None else max_count
+        event = self._watch_event
+        # Clear, then publish the window, then check: an edge or wake_waiter()
+        # landing after the clear sets the event, and anything earlier is seen
+        # by the count and stop checks below.
+        event.clear()
+        self._watch = (low, high, min_c, max_c)
+        try:
+            count = self._raw + self._offset
+            if low <= count <= high or not min_c <= count <= max_c:
+                return count
+            if stopped is not None and stopped():
+                return count
+            event.wait(timeout)
+        finally:
+            self._watch = None
+        return self._raw + self._offset
+
+    def wake_waiter(self) -> None:
+        """Return a pending wait_for_count() early (e.g. on emergency stop)."""
+        self._watch_event.set()
 
     def reset(self, value: int = 0) -> None:
-        with self._lock:
-            self._count = value
+        # One attribute store, so no lock: concurrent resets resolve to whichever
+        # stored last, each consistent with the raw count it read.
+        self._offset = value - self._raw
+        if self._watch is not None:
+            self._watch_event.set()  # let a waiter re-check against the new origin
 
     # Convenience for offline tests without GPIO callbacks
     def simulate_ticks(self, delta: int) -> None:
+        self._add(delta)
+
+
+# pigpio constants (values from pigpio.py), so an injected pi object needs no pigpio import.
+_PIGPIO_INPUT = 0
+_PIGPIO_PUD_OFF = 0
+_PIGPIO_PUD_UP = 2
+_PIGPIO_EITHER_EDGE = 2
+
+
+class PigpioEncoderReader(EncoderReader):
+    """
+    EncoderReader fed by the pigpio daemon instead of RPi.GPIO.
+
+    pigpiod samples the pins in C (5 us by default) and delivers each edge with
+    its level, so the callbacks never read a pin: A edges count using the last
+    B level reported by the daemon. Requires `pigpio` and a running `pigpiod`.
+    """
+
+    __slots__ = ("_pi", "_owns_pi", "_callbacks")
+
+    def __init__(self, cfg: EncoderConfig, *, pi=None, name: str = "encoder") -> None:
+        super().__init__(cfg, name=name)
+        self._pi = pi  # allows injecting a fake pigpio.pi in tests
+        self._owns_pi = pi is None
+        self._callbacks: list = []
+
+    def _ensure_pi(self):
+        if self._pi is not None:
+            return self._pi
+        try:
+            import pigpio  # type: ignore
+        except ImportError as exc:  # pragma: no cover - exercised on hardware
+            raise RuntimeError("pigpio not available; install it and start pigpiod, or use EncoderReader.") from exc
+        with _thread_affinity(self.cfg.irq_cpus, self.name):
+            pi = pigpio.pi()  # starts the callback thread
+        if not pi.connected:  # pragma: no cover - exercised on hardware
+            raise RuntimeError("pigpiod is not running (sudo systemctl start pigpiod)")
+        self._pi = pi
+        return pi
+
+    def start(self) -> None:
+        if self._started:
+            return
+        pi = self._ensure_pi()
+        pin_a, pin_b = self.cfg.pin_a, self.cfg.pin_b
+        pull = _PIGPIO_PUD_UP if self.cfg.pull_up else _PIGPIO_PUD_OFF
+        for pin in (pin_a, pin_b):
+            pi.set_mode(pin, _PIGPIO_INPUT)
+            pi.set_pull_up_down(pin, pull)
+        if self.cfg.debounce_ms and self.cfg.debounce_ms > 0:
+            # Level must be stable this long before the daemon reports it. B edges
+            # only count in x4 mode, so B is filtered there too.
+            for pin in (pin_a, pin_b) if self.cfg.quadrature_x4 else (pin_a,):
+                pi.set_glitch_filter(pin, self.cfg.debounce_ms * 1000)
+        self.last_a = pi.read(pin_a)
+        self.last_b = pi.read(pin_b)
+        self._prev_ab = (self.last_a << 1) | self.last_b
+        self._callbacks = [
+            pi.callback(pin_a, _PIGPIO_EITHER_EDGE, self._on_a),
+            pi.callback(pin_b, _PIGPIO_EITHER_EDGE, self._on_b),
+        ]
+        self._started = True
+        LOG.info("%s listening via pigpiod on A=%s B=%s", self.name, pin_a, pin_b)
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        for cb in self._callbacks:
+            cb.cancel()
+        self._callbacks = []
+        if self._owns_pi:
+            self._pi.stop()
+            self._pi = None
+        self._started = False
+
+    def _on_a(self, gpio: int, level: int, tick: int) -> None:
+        if level > 1:  # watchdog timeout, not an edge
+            return
+        if self.cfg.quadrature_x4:
+            self._step_x4(level, self.last_b)
+            return
+        self.last_a = level
+        self._add(1 - ((level ^ self.last_b) << 1))
+
+    def _on_b(self, gpio: int, level: int, tick: int) -> None:
+        if level > 1:
+            return
+        if self.cfg.quadrature_x4:
+            self._step_x4(self.last_a, level)
+        else:
+            self.last_b = level
+
+    def read_levels(self) -> tuple[int, int]:
+        bits = self._ensure_pi().read_bank_1()
+        return (bits >> self.cfg.pin_a) & 1, (bits >> self.cfg.pin_b) & 1
+
+
+class MotorSession:
+    """
+    Manual control of one motor (and optional encoder) for the web UIs.
+
+    Commands are serialized by a per-session lock and publish
+    (throttle, last_action) as one `snapshot` tuple; status() never takes the
+    lock, so readers do not wait behind a command's I2C writes. An identical
+    repeat of the last command within `coalesce_s` is dropped.
+    """
+
+    def __init__(
+        self, driver: MotorDriver, encoder: Optional[EncoderReader] = None, *, coalesce_s: float = 0.05
+    ) -> None:
+        self.driver = driver
+        self.encoder = encoder
+        self._lock = threading.Lock()
+        # A repeat of the last applied (action, duty) within this window is dropped:
+        # rapid clicks would otherwise re-send identical I2C writes.
+        self._coalesce_ns = int(coalesce_s * 1_000_000_000)
+        self._last_cmd: tuple = ((), 0)  # ((action, duty), monotonic_ns) of the last applied command
+        self._throttle = 0.0
+        self._last_action = "idle"
+        self._closed = False  # shutdown() runs once (UIs call it from finally and atexit)
+        self.snapshot: tuple = self._make_snapshot()
+        # (count, monotonic_ns) of the previous sample, swapped as one tuple.
+        self._rate_ref = (encoder.read() if encoder else 0, time.monotonic_ns())
+        # Action name -> bound handler(duty); one dict lookup and one call per command.
+        self._actions: dict[str, Callable[[float], None]] = {
+            "forward": self._do_forward,
+            "reverse": self._do_reverse,
+            "brake": self._do_brake,
+            "release": self._do_release,
+            "reset": self._do_reset,
+        }
+
+    def _do_forward(self, duty: float) -> None:
+        throttle = abs(duty)
+        self.driver.set_throttle(throttle)
+        self._throttle = throttle
+        self._last_action = "forward"
+
+    def _do_reverse(self, duty: float) -> None:
+        throttle = -abs(duty)
+        self.driver.set_throttle(throttle)
+        self._throttle = throttle
+        self._last_action = "reverse"
+
+    def _do_brake(self, duty: float) -> None:
+        self.driver.brake()
+        self._throttle = 0.0
+        self._last_action = "brake"
+
+    def _do_release(self, duty: float) -> None:
+        self.driver.release()
+        self._throttle = 0.0
+        self._last_action = "release"
+
+    def _do_reset(self, duty: float) -> None:
+        if self.encoder:
+            self.encoder.reset(0)
+        self._last_action = "reset-encoder"
+
+    def _make_snapshot(self) -> tuple:
+        """Build the tuple published after each command; subclasses may append fields."""
+        return (self._throttle, self._last_action)
+
+    def command(self, action: str, duty: float) -> None:
+        handler = self._actions.get(action)
+        if handler is None:
+            raise ValueError(f"unknown action {action}")
+        duty = float(duty)
+        key = (action, round(duty, 3))
         with self._lock:
-            self._count += delta
+            now = time.monotonic_ns()
+            last_key, last_ts = self._last_cmd
+            if key == last_key and now - last_ts < self._coalesce_ns:
+                LOG.debug("%s %s coalesced", self.driver.name, action)
+                return
+            handler(duty)
+            self._last_cmd = (key, now)
+            self.snapshot = self._make_snapshot()
+            LOG.info("%s %s (duty=%.2f)", self.driver.name, self._last_action, self._throttle)
+
+    def sample(self) -> tuple[int, int, float]:
+        """Return (count, delta, rate_cps) relative to the previous sample."""
+        now = time.monotonic_ns()
+        count = self.encoder.read() if self.encoder else 0
+        last_count, last_ts = self._rate_ref
+        self._rate_ref = (count, now)
+        # Integer nanoseconds; a single float division for the displayed rate.
+        dt_ns = now - last_ts
+        delta = count - last_count
+        rate = (delta * 1_000_000_000 / dt_ns) if dt_ns > 0 else 0.0
+        return count, delta, rate
+
+    def raw_levels(self) -> tuple[Optional[int], Optional[int]]:
+        if self.encoder is None:
+            return None, None
+        try:
+            return self.encoder.read_levels()
+        except Exception as exc:  # pragma: no cover - hardware path
+            LOG.debug("Raw level read failed for %s: %s", self.driver.name, exc)
+            return None, None
+
+    def status(self) -> dict:
+        snap = self.snapshot
+        count, delta, rate = self.sample()
+        raw_a, raw_b = self.raw_levels()
+        return {
+            "count": count,
+            "delta": delta,
+            "rate_cps": rate,
+            "throttle": snap[0],
+            "last_action": snap[1],
+            "raw_a": raw_a,
+            "raw_b": raw_b,
+        }
+
+    def shutdown(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.driver.brake()
+        except Exception as exc:  # pragma: no cover - hardware path
+            LOG.error("Failed to brake %s: %s", self.driver.name, exc)
+        self.driver.close()
+        if self.encoder:
+            try:
+                self.encoder.stop()
+            except Exception as exc:  # pragma: no cover - hardware path
+                LOG.error("Failed to stop encoder for %s: %s", self.driver.name, exc)
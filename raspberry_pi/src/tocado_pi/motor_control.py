@@ -4,27 +4,39 @@ High-level motor control primitives built on top of MotorDriver + EncoderReader.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
 import time
+from array import array
 from dataclasses import dataclass
 from typing import Callable, Optional
 
 from .config import MotorConfig
-from .hardware import MotorDriver, EncoderReader
+from .hardware import MotorDriver, EncoderReader, _clamp
 
 LOG = logging.getLogger(__name__)
 
+# Upper bound on one edge-driven wait so timeout and stop requests are still seen.
+_EVENT_WAIT_S = 0.2
 
-def _clamp(value: float, low: float = -1.0, high: float = 1.0) -> float:
-    return max(low, min(high, value))
+# Jiffy-resolution clock (a vDSO memory read) for in-loop deadline checks; Linux only.
+_COARSE_CLOCK = getattr(time, "CLOCK_MONOTONIC_COARSE", None)
 
 
-@dataclass
+def _coarse_monotonic() -> float:
+    return time.clock_gettime(_COARSE_CLOCK)
+
+
+@dataclass(frozen=True, slots=True)
 class MoveResult:
     target: int
     final_count: int
     elapsed_s: float
     reached: bool
+    # (seconds since start, count) per loop iteration when move_to_count(record=True);
+    # packed C arrays, so recording allocates no Python objects per sample.
+    trajectory: Optional[tuple[array, array]] = None
 
 
 class MotorController:
@@ -35,8 +47,12 @@ class MotorController:
     - Uses simple open-loop duty + encoder feedback for stop conditions.
     - Enforces bounds (min/max count) and a runtime timeout.
     - Can be exercised with fakes by injecting motor, encoder, now/sleep.
+    - Loop deadline checks use `coarse_now` (CLOCK_MONOTONIC_COARSE by default,
+      or the injected `now`); start/elapsed bookkeeping uses `now`.
     """
 
+    __slots__ = ("motor", "encoder", "cfg", "_now", "_sleep", "_coarse_now", "_stop_event", "_default_duty")
+
     def __init__(
         self,
         motor: MotorDriver,
@@ -45,17 +61,28 @@ class MotorController:
         *,
         now: Callable[[], float] = time.monotonic,
         sleep: Callable[[float], None] = time.sleep,
+        coarse_now: Optional[Callable[[], float]] = None,
     ) -> None:
         self.motor = motor
         self.encoder = encoder
         self.cfg = cfg
         self._now = now
-        self._sleep = sleep
-        self._stop_flag = False
+        self._stop_event = threading.Event()
+        # The default sleep waits on the stop event, so emergency_stop() cuts a poll short.
+        self._sleep = self._stop_event.wait if sleep is time.sleep else sleep
+        if coarse_now is None:
+            coarse_now = _coarse_monotonic if now is time.monotonic and _COARSE_CLOCK is not None else now
+        self._coarse_now = coarse_now
+        # cfg is frozen, so the move speed used when no duty is given is fixed too.
+        self._default_duty = _clamp(abs(cfg.shield.default_duty), 0.0, 1.0)
 
     def emergency_stop(self) -> None:
-        self._stop_flag = True
+        self._stop_event.set()
         self.motor.brake()
+        # Wake a move blocked in the encoder's edge wait instead of letting it time out.
+        wake = getattr(self.encoder, "wake_waiter", None)
+        if wake is not None:
+            wake()
         LOG.warning("%s emergency stop triggered", self.cfg.name)
 
     def spin_for(self, duty: float, seconds: float) -> MoveResult:
@@ -64,15 +91,21 @@ class MotorController:
         """
         duty = _clamp(duty)
         start = self._now()
-        deadline = start + min(seconds, self.cfg.limits.max_runtime_s)
+        _, _, _, poll, max_runtime_s = self.cfg.limits.snapshot()
+        deadline = start + min(seconds, max_runtime_s)
         LOG.info("%s spin_for duty=%.2f duration=%.2fs", self.cfg.name, duty, seconds)
-        self.motor.set_throttle(duty)
-        while self._now() < deadline and not self._stop_flag:
-            self._sleep(self.cfg.limits.poll_interval_s)
-        self.motor.brake()
+        coarse_now = self._coarse_now
+        sleep = self._sleep
+        stopped = self._stop_event.is_set
+        self.motor.set_throttle_unchecked(duty)  # clamped above
+        try:
+            while coarse_now() < deadline and not stopped():
+                sleep(poll)
+        finally:
+            self.motor.brake()
         end_count = self.encoder.read()
         elapsed = self._now() - start
-        return MoveResult(target=end_count, final_count=end_count, elapsed_s=elapsed, reached=not self._stop_flag)
+        return MoveResult(target=end_count, final_count=end_count, elapsed_s=elapsed, reached=not stopped())
 
     def move_to_count(
         self,
@@ -80,6 +113,7 @@ class MotorController:
         *,
         duty: Optional[float] = None,
         timeout_s: Optional[float] = None,
+        record: bool = False,
     ) -> MoveResult:
         """
         Move until the encoder count reaches target_count within tolerance.
@@ -89,17 +123,103 @@ class MotorController:
         - timeout
         - bounds violation
         - emergency_stop flag
+
+        With `record=True` the result carries the (t, count) trajectory, sampled
+        every poll_interval_s (recording moves always poll: edge waits only wake
+        at the target or every _EVENT_WAIT_S, which is too sparse to analyse).
         """
         limits = self.cfg.limits
-        if target_count < limits.min_count or target_count > limits.max_count:
-            raise ValueError(f"target_count {target_count} is outside [{limits.min_count}, {limits.max_count}]")
+        # One read of the (calibration-mutable) limits per move, unpacked into locals.
+        lim = limits.snapshot()
+        min_c, max_c, tol, poll, _ = lim
+        start_time, deadline, low, high = self._start_move(target_count, duty, timeout_s, lim)
+
+        # Real encoders wake us from their edge callback; plain fakes (or
+        # limits.event_driven=False, or a recording move) poll every poll_interval_s.
+        wait_for_count = getattr(self.encoder, "wait_for_count", None) if limits.event_driven and not record else None
 
-        duty = abs(duty if duty is not None else self.cfg.shield.default_duty)
-        duty = _clamp(duty, 0.0, 1.0)
+        # Loop-invariant lookups bound to locals.
+        read = self.encoder.read
+        now = self._now
+        coarse_now = self._coarse_now
+        sleep = self._sleep
+        stopped = self._stop_event.is_set
+        rec_t = array("d") if record else None
+        rec_c = array("q") if record else None
+        reached = False
+        try:
+            while not stopped():
+                current = read()
+                if record:
+                    rec_t.append(now() - start_time)
+                    rec_c.append(current)
+                if low <= current <= high:
+                    reached = True
+                    break
+                if self._move_should_stop(current, target_count, deadline, coarse_now(), min_c, max_c):
+                    break
+                if wait_for_count is not None:
+                    wait_for_count(
+                        target_count,
+                        tol,
+                        max(0.0, min(deadline - now(), _EVENT_WAIT_S)),
+                        min_count=min_c,
+                        max_count=max_c,
+                        stopped=stopped,
+                    )
+                else:
+                    sleep(poll)
+        finally:
+            self.motor.brake()
+        return self._finish_move(target_count, start_time, reached, (rec_t, rec_c) if record else None)
+
+    async def move_to_count_async(
+        self,
+        target_count: int,
+        *,
+        duty: Optional[float] = None,
+        timeout_s: Optional[float] = None,
+    ) -> MoveResult:
+        """
+        Awaitable move_to_count() for asyncio callers.
+
+        Polls the encoder every poll_interval_s with asyncio.sleep, so one event
+        loop can drive several controllers (and serve requests) without a thread
+        per motor. Brakes on completion and on cancellation.
+        """
+        lim = self.cfg.limits.snapshot()
+        min_c, max_c, _, poll, _ = lim
+        start_time, deadline, low, high = self._start_move(target_count, duty, timeout_s, lim)
+        read = self.encoder.read
+        coarse_now = self._coarse_now
+        stopped = self._stop_event.is_set
+        reached = False
+        try:
+            while not stopped():
+                current = read()
+                if low <= current <= high:
+                    reached = True
+                    break
+                if self._move_should_stop(current, target_count, deadline, coarse_now(), min_c, max_c):
+                    break
+                await asyncio.sleep(poll)
+        finally:
+            self.motor.brake()
+        return self._finish_move(target_count, start_time, reached)
+
+    def _start_move(
+        self, target_count: int, duty: Optional[float], timeout_s: Optional[float], lim: tuple
+    ) -> tuple[float, float, int, int]:
+        """Validate the target, start the motor and return (start_time, deadline, low, high)."""
+        min_c, max_c, tol, _, max_runtime_s = lim
+        if target_count < min_c or target_count > max_c:
+            raise ValueError(f"target_count {target_count} is outside [{min_c}, {max_c}]")
+
+        duty = self._default_duty if duty is None else _clamp(abs(duty), 0.0, 1.0)
 
         start_count = self.encoder.read()
-        direction = 1 if target_count >= start_count else -1
-        timeout = timeout_s if timeout_s is not None else limits.max_runtime_s
+        throttle = duty if target_count >= start_count else -duty
+        timeout = timeout_s if timeout_s is not None else max_runtime_s
         start_time = self._now()
         deadline = start_time + timeout
 
@@ -109,40 +229,39 @@ class MotorController:
             target_count,
             start_count,
             duty,
-            direction,
+            1 if throttle >= 0 else -1,
             timeout,
         )
 
-        self.motor.set_throttle(direction * duty)
-        reached = False
-        while not self._stop_flag:
-            current = self.encoder.read()
-            if _within_tolerance(current, target_count, limits.stop_tolerance):
-                reached = True
-                break
-            if self._now() > deadline:
-                LOG.warning("%s move_to timeout current=%s target=%s", self.cfg.name, current, target_count)
-                break
-            if current < limits.min_count or current > limits.max_count:
-                LOG.error(
-                    "%s count %s exceeded limits [%s,%s]; braking",
-                    self.cfg.name,
-                    current,
-                    limits.min_count,
-                    limits.max_count,
-                )
-                break
-            self._sleep(limits.poll_interval_s)
+        # Target window computed once; the loop only does a chained comparison.
+        low, high = _tolerance_window(target_count, tol)
+        self.motor.set_throttle_unchecked(throttle)  # duty already clamped to 0..1
+        return start_time, deadline, low, high
 
-        self.motor.brake()
+    def _move_should_stop(
+        self, current: int, target_count: int, deadline: float, now: float, min_c: int, max_c: int
+    ) -> bool:
+        if now > deadline:
+            LOG.warning("%s move_to timeout current=%s target=%s", self.cfg.name, current, target_count)
+            return True
+        if current < min_c or current > max_c:
+            LOG.error("%s count %s exceeded limits [%s,%s]; braking", self.cfg.name, current, min_c, max_c)
+            return True
+        return False
+
+    def _finish_move(
+        self, target_count: int, start_time: float, reached: bool, trajectory: Optional[tuple] = None
+    ) -> MoveResult:
         elapsed = self._now() - start_time
         final_count = self.encoder.read()
-        if not reached and self._stop_flag:
+        if not reached and self._stop_event.is_set():
             LOG.warning("%s move_to interrupted by stop", self.cfg.name)
-        return MoveResult(target=target_count, final_count=final_count, elapsed_s=elapsed, reached=reached)
+        return MoveResult(
+            target=target_count, final_count=final_count, elapsed_s=elapsed, reached=reached, trajectory=trajectory
+        )
 
 
-def _within_tolerance(value: int, target: int, tol: int) -> bool:
-    if tol <= 0:
-        return value == target
-    return target - tol <= value <= target + tol
+def _tolerance_window(target: int, tol: int) -> tuple[int, int]:
+    """Inclusive (low, high) counts accepted as 'at target'; tol <= 0 means exact."""
+    tol = max(tol, 0)
+    return target - tol, target + tol
@@ -0,0 +1,64 @@
+"""
+Flask plumbing shared by the debug, web and calibration UIs.
+
+Requires flask and orjson (both in requirements.txt); waitress is optional.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from typing import Any
+
+import orjson
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+LOG = logging.getLogger(__name__)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (compact output, keys in insertion order)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=self.default), mimetype=self.mimetype)
+
+
+def enable_compression(app: Flask, *, min_size: int = 200) -> None:
+    """gzip/deflate responses of `min_size` bytes or more when flask-compress is installed."""
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        LOG.info("flask-compress not installed; responses are sent uncompressed")
+        return
+    # /events stays uncompressed: a compressing stream would buffer the frames.
+    app.config.update(COMPRESS_MIN_SIZE=min_size, COMPRESS_STREAMS=False, COMPRESS_ALGORITHM=["gzip", "deflate"])
+    Compress(app)
+
+
+def run_server(app: Flask, args: argparse.Namespace) -> None:
+    """
+    Serve with waitress (keep-alive, thread pool) unless --server flask or waitress is missing.
+
+    Expects `args.server`, `args.host`, `args.port` and `args.threads`.
+    """
+    if args.server == "waitress":
+        try:
+            from waitress import serve
+        except ImportError:
+            LOG.warning("waitress not installed; falling back to Flask's development server")
+        else:
+            serve(app, host=args.host, port=args.port, threads=args.threads)
+            return
+    # HTTP/1.1 lets the development server keep connections alive between requests.
+    from werkzeug.serving import WSGIRequestHandler
+
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    app.run(host=args.host, port=args.port, debug=False, use_reloader=False)
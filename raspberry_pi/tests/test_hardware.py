@@ -0,0 +1,271 @@
+import threading
+import time
+
+import pytest
+
+from tocado_pi.config import EncoderConfig
+from tocado_pi.hardware import EncoderReader, MotorDriver, MotorSession, PigpioEncoderReader, make_fast_driver
+
+
+class FakeGPIO:
+    BCM = "BCM"
+    IN = "IN"
+    PUD_UP = "PUD_UP"
+    PUD_OFF = "PUD_OFF"
+    BOTH = "BOTH"
+
+    def __init__(self):
+        self.mode = None
+        self.levels = {}
+        self.callbacks = {}
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setup(self, pin, direction, pull_up_down=None):
+        self.levels.setdefault(pin, 1)
+
+    def add_event_detect(self, pin, edge, callback=None, **kwargs):
+        self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def input(self, pin):
+        return self.levels[pin]
+
+    def set_level(self, pin, level):
+        self.levels[pin] = level
+        if pin in self.callbacks:
+            self.callbacks[pin](pin)
+
+
+def make_encoder():
+    gpio = FakeGPIO()
+    encoder = EncoderReader(EncoderConfig(pin_a=17, pin_b=27), gpio=gpio, name="test-encoder")
+    encoder.start()
+    return encoder, gpio
+
+
+def test_edges_count_up_and_down():
+    encoder, gpio = make_encoder()
+
+    gpio.set_level(17, 0)  # A falls with B high: A != B -> -1
+    gpio.set_level(17, 1)  # A rises with B high: A == B -> +1
+    gpio.set_level(17, 0)
+
+    assert encoder.read() == -1
+    assert encoder.read_levels() == (0, 1)
+    assert (encoder.last_a, encoder.last_b) == (0, 1)
+
+
+def test_x4_decoding_counts_a_and_b_edges():
+    gpio = FakeGPIO()
+    encoder = EncoderReader(EncoderConfig(pin_a=17, pin_b=27, quadrature_x4=True), gpio=gpio)
+    encoder.start()
+
+    # AB: 11 -> 10 -> 00 -> 01 -> 11, one cycle in the direction A edges count up (A == B).
+    for pin, level in ((27, 0), (17, 0), (27, 1), (17, 1)):
+        gpio.set_level(pin, level)
+    assert encoder.read() == 4
+
+    gpio.set_level(17, 0)  # and back one step
+    gpio.set_level(17, 0)  # repeated level (bounce) counts nothing
+    assert encoder.read() == 3
+
+    encoder.stop()
+    assert gpio.callbacks == {}
+
+
+def test_wait_for_count_wakes_when_target_reached():
+    encoder, _ = make_encoder()
+
+    def drive():
+        for _ in range(5):
+            time.sleep(0.01)
+            encoder.simulate_ticks(1)
+
+    threading.Thread(target=drive, daemon=True).start()
+    start = time.monotonic()
+    count = encoder.wait_for_count(5, 0, timeout=2.0)
+
+    assert count == 5
+    assert time.monotonic() - start < 1.0
+
+
+def test_wake_waiter_interrupts_a_concurrent_wait():
+    encoder, _ = make_encoder()
+    stop = threading.Event()
+
+    def stopper():
+        time.sleep(0.02)
+        stop.set()
+        encoder.wake_waiter()
+
+    threading.Thread(target=stopper, daemon=True).start()
+    start = time.monotonic()
+    encoder.wait_for_count(100, 0, timeout=2.0, stopped=stop.is_set)
+    assert time.monotonic() - start < 1.0
+
+    # A wake that landed before the wait was armed is caught by the stop re-check.
+    start = time.monotonic()
+    encoder.wait_for_count(100, 0, timeout=2.0, stopped=stop.is_set)
+    assert time.monotonic() - start < 0.5
+
+
+def test_wait_for_count_times_out_and_reports_bounds():
+    encoder, _ = make_encoder()
+
+    assert encoder.wait_for_count(10, 1, timeout=0.02) == 0
+    encoder.reset(-3)
+    assert encoder.wait_for_count(10, 1, timeout=2.0, min_count=0, max_count=20) == -3
+
+
+class FakePi:
+    def __init__(self):
+        self.levels = {17: 1, 27: 1}
+        self.callbacks = {}
+        self.glitch_us = {}
+
+    def set_mode(self, pin, mode):
+        pass
+
+    def set_pull_up_down(self, pin, pull):
+        pass
+
+    def set_glitch_filter(self, pin, steady_us):
+        self.glitch_us[pin] = steady_us
+
+    def read(self, pin):
+        return self.levels[pin]
+
+    def read_bank_1(self):
+        return sum(level << pin for pin, level in self.levels.items())
+
+    def callback(self, pin, edge, func):
+        self.callbacks[pin] = func
+        return FakeCallback(self, pin)
+
+    def edge(self, pin, level):
+        self.levels[pin] = level
+        self.callbacks[pin](pin, level, 0)
+
+
+class FakeCallback:
+    def __init__(self, pi, pin):
+        self.pi, self.pin = pi, pin
+
+    def cancel(self):
+        self.pi.callbacks.pop(self.pin)
+
+
+def test_pigpio_encoder_counts_from_reported_levels():
+    pi = FakePi()
+    encoder = PigpioEncoderReader(EncoderConfig(pin_a=17, pin_b=27), pi=pi)
+    encoder.start()
+
+    pi.edge(17, 0)  # A falls while B high -> -1
+    pi.edge(27, 0)  # B edges only update the level
+    pi.edge(17, 1)  # A rises while B low -> -1
+    pi.callbacks[17](17, 2, 0)  # watchdog report, ignored
+    assert encoder.read() == -2
+    assert encoder.read_levels() == (1, 0)
+
+    encoder.stop()
+    assert pi.callbacks == {}
+
+
+def test_pigpio_x4_counts_b_edges_and_filters_both_pins():
+    pi = FakePi()
+    encoder = PigpioEncoderReader(EncoderConfig(pin_a=17, pin_b=27, debounce_ms=2, quadrature_x4=True), pi=pi)
+    encoder.start()
+
+    for pin, level in ((27, 0), (17, 0), (27, 1), (17, 1)):
+        pi.edge(pin, level)
+    assert encoder.read() == 4
+    assert pi.glitch_us == {17: 2000, 27: 2000}
+
+
+class DummyMotor:
+    throttle = None
+
+
+def test_motor_session_commands_publish_snapshot_and_status():
+    encoder, _ = make_encoder()
+    motor = DummyMotor()
+    session = MotorSession(MotorDriver(motor, name="m1"), encoder)
+
+    session.command("reverse", 0.4)
+    encoder.simulate_ticks(-3)
+
+    assert motor.throttle == -0.4
+    assert session.snapshot == (-0.4, "reverse")
+    status = session.status()
+    assert (status["count"], status["delta"], status["throttle"], status["last_action"]) == (-3, -3, -0.4, "reverse")
+    assert session.status()["delta"] == 0
+
+    session.command("brake", 0.0)
+    assert motor.throttle == 0.0
+    assert session.snapshot == (0.0, "brake")
+    with pytest.raises(ValueError):
+        session.command("spin", 1.0)
+
+
+def test_motor_session_coalesces_repeated_commands():
+    motor = DummyMotor()
+    session = MotorSession(MotorDriver(motor, name="m1"), coalesce_s=60.0)
+
+    session.command("forward", 0.5)
+    motor.throttle = None
+    session.command("forward", 0.5)
+    assert motor.throttle is None  # identical command inside the window is dropped
+
+    session.command("forward", 0.6)
+    assert motor.throttle == 0.6
+
+
+class FakeBus:
+    def __init__(self):
+        self.writes = 0
+        self.closed = 0
+
+    def i2c_rdwr(self, *msgs):
+        self.writes += 1
+
+    def close(self):
+        self.closed += 1
+
+
+class FakeChannel:
+    def __init__(self, index):
+        self._index = index
+
+
+class KitMotor:
+    decay_mode = 0
+
+    def __init__(self, positive, negative):
+        self._positive, self._negative = FakeChannel(positive), FakeChannel(negative)
+
+
+def test_fast_driver_closes_only_a_bus_it_owns():
+    pytest.importorskip("smbus2")
+    shared = FakeBus()
+    driver = make_fast_driver(KitMotor(8, 9), bus=shared, address=0x60)
+    driver.brake()
+    driver.close()
+    assert (shared.writes, shared.closed) == (1, 0)
+
+    owned = FakeBus()
+    driver = make_fast_driver(KitMotor(8, 9), bus=owned, address=0x60, owns_bus=True)
+    driver.close()
+    driver.close()
+    assert owned.closed == 1
+
+    # Non-adjacent channels fall back to MotorKit writes: an owned bus is closed at once.
+    unused = FakeBus()
+    assert type(make_fast_driver(KitMotor(8, 10), bus=unused, address=0x60, owns_bus=True)) is MotorDriver
+    assert unused.closed == 1
@@ -1,4 +1,6 @@
+import asyncio
 import math
+from bisect import bisect_right
 
 import pytest
 
@@ -22,40 +24,43 @@ class DummyMotor:
         self.history.append(value)
 
 
-class FakeEncoder:
-    def __init__(self, count=0):
-        self.count = count
+class TrajectoryStub:
+    """
+    Clock and encoder driven by precomputed (t, count) samples.
 
-    def read(self):
-        return self.count
-
-    def bump(self, delta):
-        self.count += delta
+    sleep() advances the clock and bisects to the sample in effect, so a step
+    costs one lookup and whole motion profiles are built up front.
+    """
 
+    def __init__(self, ts, counts):
+        self.ts = list(ts)
+        self.counts = list(counts)
+        self.t = self.ts[0]
+        self.i = 0
 
-class TimeStub:
-    def __init__(self, encoder: FakeEncoder | None = None, step: int = 1):
-        self.t = 0.0
-        self.encoder = encoder
-        self.step = step
+    @classmethod
+    def ramp(cls, step_s: float, counts) -> "TrajectoryStub":
+        counts = list(counts)
+        return cls([i * step_s for i in range(len(counts))], counts)
 
     def now(self):
         return self.t
 
     def sleep(self, dt):
         self.t += dt
-        if self.encoder:
-            self.encoder.bump(self.step)
+        self.i = bisect_right(self.ts, self.t + 1e-9) - 1
+
+    def read(self):
+        return self.counts[self.i]
 
 
 def make_controller(
     *,
     encoder_start=0,
     limits: MotionLimits | None = None,
-    time_stub: TimeStub | None = None,
+    trajectory: TrajectoryStub | None = None,
 ):
     motor = MotorDriver(DummyMotor(), name="test-motor")
-    encoder = FakeEncoder(encoder_start)
     limits = limits or MotionLimits(max_runtime_s=1.0, poll_interval_s=0.01, stop_tolerance=1)
     cfg = MotorConfig(
         shield=MotorShieldConfig(default_duty=0.5),
@@ -63,13 +68,14 @@ def make_controller(
         limits=limits,
         name="test",
     )
-    stub = time_stub or TimeStub(encoder=encoder, step=1)
-    ctrl = MotorController(motor, encoder, cfg, now=stub.now, sleep=stub.sleep)
-    return ctrl, motor, encoder, stub
+    # Default: one count per poll interval, starting at encoder_start.
+    stub = trajectory or TrajectoryStub.ramp(limits.poll_interval_s, range(encoder_start, encoder_start + 200))
+    ctrl = MotorController(motor, stub, cfg, now=stub.now, sleep=stub.sleep)
+    return ctrl, motor, stub
 
 
 def test_move_reaches_target_forward():
-    ctrl, motor, encoder, stub = make_controller(encoder_start=0)
+    ctrl, motor, stub = make_controller(encoder_start=0)
 
     result = ctrl.move_to_count(5, duty=0.6)
 
@@ -81,8 +87,8 @@ def test_move_reaches_target_forward():
 
 def test_move_respects_timeout_when_stalled():
     limits = MotionLimits(max_runtime_s=0.05, poll_interval_s=0.01, stop_tolerance=0)
-    stub = TimeStub(encoder=None, step=0)  # encoder never advances
-    ctrl, motor, encoder, stub = make_controller(encoder_start=0, limits=limits, time_stub=stub)
+    stalled = TrajectoryStub([0.0], [0])  # encoder never advances
+    ctrl, motor, stub = make_controller(encoder_start=0, limits=limits, trajectory=stalled)
 
     result = ctrl.move_to_count(3, duty=0.5, timeout_s=0.05)
 
@@ -92,10 +98,48 @@ def test_move_respects_timeout_when_stalled():
     assert motor._motor.history[-1] == 0.0
 
 
+def test_move_records_trajectory_on_request():
+    ctrl, motor, stub = make_controller()
+
+    result = ctrl.move_to_count(5, duty=0.6, record=True)
+
+    times, counts = result.trajectory
+    assert len(times) == len(counts) >= 2
+    assert list(counts) == sorted(counts)
+    assert counts[0] == 0 and counts[-1] == result.final_count
+    assert ctrl.move_to_count(5, duty=0.6).trajectory is None
+
+
+def test_recording_polls_at_poll_interval_even_when_event_driven():
+    ctrl, motor, stub = make_controller()
+    assert ctrl.cfg.limits.event_driven
+
+    def fail(*args, **kwargs):
+        raise AssertionError("edge wait used while recording")
+
+    stub.wait_for_count = fail
+
+    times, counts = ctrl.move_to_count(20, duty=0.6, record=True).trajectory
+
+    steps = [times[i + 1] - times[i] for i in range(len(times) - 1)]
+    assert len(times) >= 20
+    assert all(math.isclose(step, ctrl.cfg.limits.poll_interval_s, rel_tol=1e-6) for step in steps)
+
+
+@pytest.mark.parametrize("tol", [0, 1, 3])
+def test_move_stops_inside_tolerance_window(tol):
+    limits = MotionLimits(max_runtime_s=1.0, poll_interval_s=0.01, stop_tolerance=tol)
+    ctrl, motor, stub = make_controller(limits=limits)
+
+    result = ctrl.move_to_count(20, duty=0.6)
+
+    assert result.reached is True
+    assert 20 - tol <= result.final_count <= 20 + tol
+
+
 def test_spin_for_runs_for_duration():
     limits = MotionLimits(max_runtime_s=0.2, poll_interval_s=0.01)
-    stub = TimeStub()
-    ctrl, motor, encoder, stub = make_controller(limits=limits, time_stub=stub)
+    ctrl, motor, stub = make_controller(limits=limits, trajectory=TrajectoryStub([0.0], [0]))
 
     result = ctrl.spin_for(0.4, seconds=0.1)
 
@@ -103,3 +147,51 @@ def test_spin_for_runs_for_duration():
     assert result.elapsed_s >= 0.1
     assert motor._motor.history[0] == 0.4
     assert motor._motor.history[-1] == 0.0
+
+
+def test_move_polls_when_event_driven_disabled():
+    limits = MotionLimits(max_runtime_s=1.0, poll_interval_s=0.01, stop_tolerance=1, event_driven=False)
+    ctrl, motor, stub = make_controller(limits=limits)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("edge wait used although event_driven=False")
+
+    stub.wait_for_count = fail
+
+    result = ctrl.move_to_count(5, duty=0.6)
+
+    assert result.reached is True
+    assert stub.t > 0  # progressed through the injected sleep
+
+
+def test_move_to_count_async_runs_alongside_other_tasks():
+    limits = MotionLimits(max_runtime_s=1.0, poll_interval_s=0.001, stop_tolerance=0)
+    ctrl, motor, stub = make_controller(limits=limits)
+
+    async def turn_shaft():
+        for _ in range(5):
+            await asyncio.sleep(0.001)
+            stub.sleep(limits.poll_interval_s)  # advance the trajectory one count
+
+    async def run():
+        result, _ = await asyncio.gather(ctrl.move_to_count_async(5, duty=0.6), turn_shaft())
+        return result
+
+    result = asyncio.run(run())
+
+    assert result.reached is True
+    assert result.final_count == 5
+    assert motor._motor.history[-1] == 0.0
+
+
+def test_emergency_stop_ends_move_and_stays_latched():
+    limits = MotionLimits(max_runtime_s=1.0, poll_interval_s=0.01, stop_tolerance=0)
+    stalled = TrajectoryStub([0.0], [0])
+    ctrl, motor, stub = make_controller(limits=limits, trajectory=stalled)
+    ctrl._sleep = lambda dt: ctrl.emergency_stop()
+
+    result = ctrl.move_to_count(10, duty=0.5)
+
+    assert result.reached is False
+    assert motor._motor.history[-1] == 0.0
+    assert ctrl.spin_for(0.5, seconds=0.1).reached is False